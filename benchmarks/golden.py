@@ -0,0 +1,105 @@
+"""Check that seeded frames stay the same, byte for byte.
+
+Refactoring the hot path should never change what a seed renders. Every case
+renders a frame with a fixed seed, and compares its SHA-256 with the one in
+golden.json. Cases cover every Shibe, every season and a few terminal sizes
+through doge.render(), packed frames, and --seed and --date through the CLI
+with piped words. Exits non-zero on any difference, so it can gate CI.
+
+Frames only change on purpose: after checking that they look right, record
+the new ones with `python benchmarks/golden.py --update`. Python's random
+module is only stable within a Python version, so record with the version CI
+runs.
+
+Run from the repository root with `python benchmarks/golden.py`.
+"""
+
+# Copyright (C) 2013-2024 Olivia Thiderman
+
+import hashlib
+import json
+import os
+import random
+import subprocess
+import sys
+from pathlib import Path
+
+import doge
+from doge import atlas, wow
+
+GOLDEN = Path(__file__).resolve().parent / "golden.json"
+SRC = Path(__file__).resolve().parent.parent / "src"
+
+SIZES = ((80, 24), (120, 40), (200, 60))
+SEED = 42
+STDIN = "such golden very frames much bytes wow regression\n" * 20
+
+
+def render_cases():
+    """Yield (name, frame) for every doge.render() case."""
+    for width, height in SIZES:
+        size = f"{width}x{height}"
+        for shibe in atlas.shibe_names():
+            rng = random.Random(SEED)
+            yield f"{size} {shibe}", doge.render(width, height, shibe=shibe, rng=rng)
+        for season in wow.SEASONS:
+            rng = random.Random(SEED)
+            yield f"{size} {season}", doge.render(width, height, season=season, rng=rng)
+        rng = random.Random(SEED)
+        yield f"{size} plain", doge.render(width, height, rng=rng, pretty=False)
+        rng = random.Random(SEED)
+        yield f"{size} pack", doge.render(width, height, rng=rng, pack=True)
+
+
+CLI_CASES = {
+    "cli seed": ["--seed", str(SEED), "--season", "none"],
+    "cli xmas date": ["--seed", str(SEED), "--date", "2024-12-24"],
+    "cli plain date": ["--seed", str(SEED), "--date", "2024-06-01", "--no-shibe"],
+    "cli frequency": ["--seed", str(SEED), "--season", "none", "-f"],
+}
+
+
+def cli_cases():
+    """Yield (name, frame) for every CLI case."""
+    env = {**os.environ, "PYTHONPATH": str(SRC), "COLUMNS": "100", "LINES": "40"}
+    for name, args in CLI_CASES.items():
+        result = subprocess.run(  # noqa: S603
+            [sys.executable, "-m", "doge", *args],
+            input=STDIN,
+            capture_output=True,
+            text=True,
+            env=env,
+            check=True,
+        )
+        yield name, result.stdout
+
+
+def digest(frame):
+    """Return the SHA-256 of a frame."""
+    return hashlib.sha256(frame.encode()).hexdigest()
+
+
+def main(update):
+    """Compare every case with its golden frame, and return the failures."""
+    actual = {
+        name: digest(frame)
+        for cases in (render_cases(), cli_cases())
+        for name, frame in cases
+    }
+    if update:
+        GOLDEN.write_text(json.dumps(actual, indent=2) + "\n", encoding="utf-8")
+        print(f"wow, recorded {len(actual)} golden frames")
+        return 0
+
+    expected = json.loads(GOLDEN.read_text(encoding="utf-8"))
+    failures = 0
+    for name in sorted(expected.keys() | actual.keys()):
+        if expected.get(name) != actual.get(name):
+            failures += 1
+            print(f"FAIL {name}")
+    print(f"{len(actual)} frames, {failures} changed")
+    return failures
+
+
+if __name__ == "__main__":
+    sys.exit(main("--update" in sys.argv[1:]) > 0)
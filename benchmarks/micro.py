@@ -0,0 +1,97 @@
+"""Micro-benchmarks for the hot spots of doge, wow.
+
+Run from the repository root with `python benchmarks/micro.py`, optionally
+naming the benchmarks to run.
+"""
+
+# Copyright (C) 2013-2024 Olivia Thiderman
+
+import re
+import sys
+import timeit
+import unicodedata
+
+from doge import core, wow
+
+SIZES = (10, 1_000, 100_000, 1_000_000)
+
+
+def report(name, size, seconds, number):
+    """Print the cost of a single call."""
+    print(f"{name:<24} {size:>9} {seconds / number * 1e9:>10.1f} ns/call")
+
+
+def bench_deque():
+    """Show that DogeDeque get/extend cost does not depend on its size."""
+    for size in SIZES:
+        bag = wow.DogeDeque(*range(size))
+        number = 100_000
+        report("DogeDeque.get", size, timeit.timeit(bag.get, number=number), number)
+
+        bag = wow.DogeDeque(*range(size))
+        new = ["such", "new", "words"]
+        number = 10_000
+        seconds = timeit.timeit(lambda: bag.extend(new), number=number)  # noqa: B023
+        report("DogeDeque.extend(3)", size, seconds, number)
+
+
+def bench_weighted():
+    """Show that WeightedDogeDeque is built in O(n) and gets in O(1)."""
+    for size in SIZES:
+        words = [f"word{i % (size // 10 + 1)}" for i in range(size)]
+        number = 10
+        seconds = timeit.timeit(
+            lambda: wow.WeightedDogeDeque(*words).build(),  # noqa: B023
+            number=number,
+        )
+        report("WeightedDogeDeque()", size, seconds, number)
+
+        bag = wow.WeightedDogeDeque(*words)
+        number = 100_000
+        seconds = timeit.timeit(bag.get, number=number)
+        report("WeightedDogeDeque.get", size, seconds, number)
+
+
+def baseline_clean_len(s):
+    """Measure a string like clean_len() did before the width engine."""
+    return len(re.sub(r"\x1b\[[0-9;]*m", "", s))
+
+
+def baseline_onscreen_len(s):
+    """Measure a string like onscreen_len() did before the width engine."""
+    return sum(2 if unicodedata.east_asian_width(ch) == "W" else 1 for ch in s)
+
+
+WIDTH_SAMPLES = {
+    "ascii": "so much terminal wow",
+    "cjk": "很多 终端 哇 ターミナル",
+    "accents": "ćéĺ ẃö̃ṽë shíbé",
+    "ansi": "\x1b[1m\x1b[38;5;42m   such color\x1b[39m\x1b[0m",
+}
+
+
+def bench_width():
+    """Compare the width engine with the functions it replaced."""
+    number = 100_000
+    for name, sample in WIDTH_SAMPLES.items():
+        for func in (
+            baseline_onscreen_len,
+            core.onscreen_len,
+            baseline_clean_len,
+            core.clean_len,
+        ):
+            seconds = timeit.timeit(lambda: func(sample), number=number)  # noqa: B023
+            report(func.__name__, name, seconds, number)
+
+
+BENCHMARKS = {"deque": bench_deque, "weighted": bench_weighted, "width": bench_width}
+
+
+def main(names):
+    """Run the named benchmarks, or all of them."""
+    for name in names or BENCHMARKS:
+        BENCHMARKS[name]()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
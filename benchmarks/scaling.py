@@ -0,0 +1,92 @@
+"""Measure how counting --input words scales with --jobs.
+
+    python benchmarks/scaling.py [--size MB] [--jobs N ...] [--min-efficiency F]
+
+Writes a corpus of Zipf distributed words to a temporary file, then counts it
+with -f for every number of jobs, by default powers of two up to the number of
+cores. Every line shows the best time of a few runs, the throughput, and the
+speedup and efficiency (speedup per job) over a single job. With
+--min-efficiency, exits non-zero if the most jobs fall short of it, so it can
+gate CI on many core hosts.
+
+Run from the repository root.
+"""
+
+# Copyright (C) 2013-2024 Olivia Thiderman
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from suite import make_corpus
+
+from doge import core
+
+REPEAT = 3
+
+
+def count(path, jobs):
+    """Return the seconds the best of a few runs took to count a file."""
+    ns = core.setup_arguments().parse_args(
+        ["-f", "--jobs", str(jobs), "--input", str(path)]
+    )
+    times = []
+    for _ in range(REPEAT):
+        doge = core.Doge(core.TTYHandler(), ns)
+        started = time.perf_counter()
+        doge.get_input_data()
+        times.append(time.perf_counter() - started)
+    return min(times)
+
+
+def main():
+    """Count a corpus with ever more jobs."""
+    parser = argparse.ArgumentParser(
+        "scaling",
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--size", help="corpus size in MB", type=int, default=512)
+    parser.add_argument("--jobs", help="job counts to try", type=int, nargs="+")
+    parser.add_argument("--min-efficiency", type=float)
+    ns = parser.parse_args()
+
+    cores = os.cpu_count() or 1
+    jobs = ns.jobs or sorted({*(1 << i for i in range(cores.bit_length())), cores})
+    if 1 not in jobs:
+        jobs = [1, *jobs]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "corpus.txt"
+        # Repeating a smaller corpus is much faster to make, and looks the same
+        # to the counting.
+        block = make_corpus(16 << 20).encode()
+        with path.open("wb") as f:
+            for _ in range(max(1, ns.size // 16)):
+                f.write(block)
+        size = path.stat().st_size
+
+        print(f"wow, {size / (1 << 20):.0f} MB on {cores} cores")
+        base = None
+        efficiency = 1.0
+        for n in jobs:
+            seconds = count(path, n)
+            base = base or seconds
+            speedup = base / seconds
+            efficiency = speedup / n
+            print(
+                f"jobs {n:>3} {seconds:>8.2f} s {size / seconds / (1 << 20):>8.1f} MB/s"
+                f" {speedup:>6.2f}x {efficiency:>6.0%}"
+            )
+
+    if ns.min_efficiency is not None and efficiency < ns.min_efficiency:
+        print(f"such slow, {efficiency:.0%} is under {ns.min_efficiency:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
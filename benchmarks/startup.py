@@ -0,0 +1,93 @@
+"""Check that the doge CLI starts within budget, wow.
+
+Every scenario runs `python -X importtime -m doge ...` a few times, and fails
+if the median time spent importing doge (including everything doge imports,
+but not the interpreter's own startup) exceeds BUDGET_MS, or if a module that
+the scenario should never need got imported. Exits non-zero on failure,
+so it can gate CI.
+
+Run from the repository root with `python benchmarks/startup.py`.
+"""
+
+# Copyright (C) 2013-2024 Olivia Thiderman
+
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+BUDGET_MS = 60
+RUNS = 7
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+
+SCENARIOS = {
+    "piped stdin": {
+        "args": ["--season", "none"],
+        "stdin": "such stdin very words\n",
+        "forbidden": {"subprocess", "fullmoon", "dateutil", "doge.season", "pathlib"},
+    },
+    "given season": {
+        "args": ["--season", "xmas"],
+        "stdin": "",
+        "forbidden": {"fullmoon", "dateutil", "doge.season", "importlib.resources"},
+    },
+}
+
+
+def import_times(args, stdin):
+    """Run doge once, and return {module: cumulative import time in us}."""
+    env = {**os.environ, "PYTHONPATH": str(SRC), "COLUMNS": "100", "LINES": "40"}
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-X", "importtime", "-m", "doge", *args],
+        input=stdin,
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        # Only count top level imports, nested ones are already included.
+        if not name.startswith("   "):
+            times[name.strip()] = times.get(name.strip(), 0) + int(cumulative)
+        else:
+            times.setdefault(name.strip(), 0)
+    return times
+
+
+def main():
+    """Check every scenario, and return the number of failures."""
+    failures = 0
+    for name, scenario in SCENARIOS.items():
+        runs = [import_times(scenario["args"], scenario["stdin"]) for _ in range(RUNS)]
+        total_ms = (
+            statistics.median(
+                sum(us for module, us in run.items() if module.startswith("doge"))
+                for run in runs
+            )
+            / 1000
+        )
+        imported = set().union(*runs)
+        leaked = {
+            module
+            for module in imported
+            for forbidden in scenario["forbidden"]
+            if module == forbidden or module.startswith(f"{forbidden}.")
+        }
+
+        ok = total_ms <= BUDGET_MS and not leaked
+        failures += not ok
+        print(f"{'ok' if ok else 'FAIL':<5}{name:<16}{total_ms:>7.1f} ms")
+        if leaked:
+            print(f"     imported {', '.join(sorted(leaked))}")
+    print(f"budget: {BUDGET_MS} ms")
+    return failures
+
+
+if __name__ == "__main__":
+    sys.exit(main())
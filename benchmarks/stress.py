@@ -0,0 +1,59 @@
+"""Render lots of frames across threads, and check that none got corrupted.
+
+Every frame is rendered twice with the same seed: once on its own, and once
+in a thread pool alongside all the others. Any shared state between renders
+makes the two differ. Exits non-zero on corruption, so it can gate CI.
+
+Run from the repository root with `python benchmarks/stress.py [frames]`.
+"""
+
+# Copyright (C) 2013-2024 Olivia Thiderman
+
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import doge
+
+FRAMES = 2_000
+THREADS = 16
+WIDTH = 100
+HEIGHT = 40
+SEASONS = (None, "xmas", "halloween")
+
+
+def render(seed):
+    """Render the frame for a seed."""
+    return doge.render(
+        WIDTH,
+        HEIGHT,
+        season=SEASONS[seed % len(SEASONS)],
+        rng=random.Random(seed),
+    )
+
+
+def main(frames):
+    """Compare threaded frames with sequential ones, return the failures."""
+    seeds = range(frames)
+    expected = [render(seed) for seed in seeds]
+
+    start = time.perf_counter()
+    # Swapping threads often makes races show up much sooner.
+    sys.setswitchinterval(1e-6)
+    with ThreadPoolExecutor(THREADS) as pool:
+        actual = list(pool.map(render, seeds))
+    seconds = time.perf_counter() - start
+
+    failures = 0
+    for seed, want, got in zip(seeds, expected, actual):
+        if got != want or got.count("\n") != want.count("\n"):
+            failures += 1
+            print(f"FAIL seed {seed}: frame differs from the sequential render")
+    print(f"{frames} frames on {THREADS} threads in {seconds:.2f} s, ", end="")
+    print(f"{failures} corrupted")
+    return failures
+
+
+if __name__ == "__main__":
+    sys.exit(main(int(sys.argv[1]) if len(sys.argv) > 1 else FRAMES) > 0)
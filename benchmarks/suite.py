@@ -0,0 +1,280 @@
+"""Benchmark doge from cold start to rendered frame, and compare runs.
+
+    python benchmarks/suite.py run [-o FILE] [BENCHMARK ...]
+    python benchmarks/suite.py compare OLD NEW [--threshold 0.1]
+
+run measures the benchmarks below (or the ones named) and saves the results
+as JSON. compare lists every result of two runs side by side, and exits
+non-zero if any of them got worse by more than the threshold, so it can gate
+CI.
+
+Everything is reproducible: corpora and frames come from fixed seeds, and the
+cache dir is a fresh temporary one. Times are the best of a few runs, to keep
+the noise of a busy machine out.
+
+    start       cold CLI start, as a subprocess, in ms
+    setup       every phase of Doge.setup(), in ms
+    stdin       get_stdin_data() throughput over synthetic corpora, in MB/s
+    frequency   FrequencyBasedDogeDeque build time versus input size, in ms
+    render      apply_text() versus terminal size and density, in us
+
+Run from the repository root.
+"""
+
+# Copyright (C) 2013-2024 Olivia Thiderman
+
+import argparse
+import datetime as dt
+import io
+import itertools
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+from pathlib import Path
+
+from doge import core, wow
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+REPEAT = 5
+SEED = 42
+
+
+def result(value, unit, *, higher_is_better=False):
+    """Return a benchmark result."""
+    return {"value": value, "unit": unit, "higher_is_better": higher_is_better}
+
+
+def best(func, number=1):
+    """Return the best time of a call to func, in seconds."""
+    return min(timeit.repeat(func, number=number, repeat=REPEAT)) / number
+
+
+def make_doge(width=120, height=40, density=30, **args):
+    """Return a Doge with Shibe in a terminal of the given size."""
+    tty = core.TTYHandler()
+    tty.width = width
+    tty.height = height
+    ns = core.setup_arguments().parse_args(["--seed", str(SEED)])
+    ns.density = density
+    vars(ns).update(args)
+    doge = core.Doge(tty, ns)
+    doge.doge, doge.doge_lens = doge.load_doge()
+    doge.setup_lines()
+    return doge
+
+
+def make_corpus(size, vocabulary=50_000):
+    """Return about size bytes of text, with Zipf distributed words."""
+    rng = random.Random(SEED)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    words = [
+        "".join(rng.choices(letters, k=rng.randint(2, 12))) for _ in range(vocabulary)
+    ]
+    cum_weights = list(
+        itertools.accumulate(1 / rank for rank in range(1, vocabulary + 1))
+    )
+    lines = []
+    written = 0
+    while written < size:
+        line = " ".join(rng.choices(words, cum_weights=cum_weights, k=12)) + "\n"
+        lines.append(line)
+        written += len(line)
+    return "".join(lines)
+
+
+def bench_start():
+    """Time a cold start of the CLI, in a subprocess."""
+    env = {**os.environ, "PYTHONPATH": str(SRC), "COLUMNS": "120", "LINES": "40"}
+    scenarios = {
+        "piped stdin": ["--season", "none"],
+        "given season": ["--season", "xmas"],
+    }
+    results = {}
+    for name, args in scenarios.items():
+        times = []
+        for _ in range(REPEAT * 2):
+            started = time.perf_counter()
+            subprocess.run(  # noqa: S603
+                [sys.executable, "-m", "doge", "--seed", str(SEED), *args],
+                input="such start very cold\n",
+                capture_output=True,
+                text=True,
+                env=env,
+                check=True,
+            )
+            times.append(time.perf_counter() - started)
+        results[f"start {name}"] = result(statistics.median(times) * 1e3, "ms")
+    return results
+
+
+def bench_setup():
+    """Time every phase of Doge.setup() on its own."""
+    phases = {
+        "seasonal": lambda doge: doge.setup_seasonal(),
+        "load doge": lambda doge: doge.load_doge(),
+        "lines": lambda doge: doge.setup_lines(),
+        "real data": lambda doge: doge.get_real_data(),
+        "apply text": lambda doge: doge.apply_text(),
+    }
+    results = {}
+    for name, phase in phases.items():
+        times = []
+        for _ in range(REPEAT):
+            doge = make_doge()
+            started = time.perf_counter()
+            phase(doge)
+            times.append(time.perf_counter() - started)
+        results[f"setup {name}"] = result(min(times) * 1e3, "ms")
+
+    # The same, without any of the system data cached.
+    times = []
+    for _ in range(REPEAT):
+        doge = make_doge(refresh=True)
+        started = time.perf_counter()
+        doge.get_real_data()
+        times.append(time.perf_counter() - started)
+    results["setup real data uncached"] = result(min(times) * 1e3, "ms")
+    return results
+
+
+def bench_stdin():
+    """Measure how fast words are read from stdin."""
+    results = {}
+    for megabytes in (1, 8):
+        text = make_corpus(megabytes << 20)
+        data = text.encode()
+        for mode, args in (("sample", {}), ("frequency", {"frequency": True})):
+
+            def read(args=args, data=data):
+                doge = make_doge(**args)
+                doge.tty.in_is_pipe = True
+                sys.stdin = io.TextIOWrapper(io.BytesIO(data), encoding="utf-8")
+                try:
+                    doge.get_stdin_data()
+                finally:
+                    sys.stdin = sys.__stdin__
+
+            seconds = best(read)
+            results[f"stdin {mode} {megabytes}MB"] = result(
+                len(data) / seconds / (1 << 20), "MB/s", higher_is_better=True
+            )
+    return results
+
+
+def bench_frequency():
+    """Time building a FrequencyBasedDogeDeque from ever more words."""
+    words = make_corpus(8 << 20).split()
+    results = {}
+    for size in (1_000, 10_000, 100_000, 1_000_000):
+        some = words[:size]
+        seconds = best(lambda some=some: wow.FrequencyBasedDogeDeque(*some))
+        results[f"frequency build {size}"] = result(seconds * 1e3, "ms")
+    return results
+
+
+def bench_render():
+    """Time apply_text() for a few terminal sizes and densities."""
+    results = {}
+    for width, height in ((80, 24), (120, 40), (200, 60), (400, 120)):
+        for density in (10, 30, 60, 100):
+            doge = make_doge(width, height, density)
+            seconds = best(doge.apply_text, number=100)
+            name = f"render {width}x{height} density {density}"
+            results[name] = result(seconds * 1e6, "us")
+    return results
+
+
+BENCHMARKS = {
+    "start": bench_start,
+    "setup": bench_setup,
+    "stdin": bench_stdin,
+    "frequency": bench_frequency,
+    "render": bench_render,
+}
+
+
+def run(names, output):
+    """Run the named benchmarks, or all of them, and save the results."""
+    results = {}
+    with tempfile.TemporaryDirectory() as cache:
+        os.environ["XDG_CACHE_HOME"] = cache
+        for name in names or BENCHMARKS:
+            for key, value in BENCHMARKS[name]().items():
+                print(f"{key:<40} {value['value']:>12.2f} {value['unit']}")
+                results[key] = value
+
+    report = {
+        "date": dt.datetime.now(dt.timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+    Path(output).write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    print(f"wow, saved to {output}")
+    return 0
+
+
+def compare(old, new, threshold):
+    """Compare two runs, and return how many results regressed."""
+    old = json.loads(Path(old).read_text(encoding="utf-8"))["results"]
+    new = json.loads(Path(new).read_text(encoding="utf-8"))["results"]
+    regressions = 0
+    for name in [name for name in new if name in old]:
+        before, after = old[name]["value"], new[name]["value"]
+        if old[name]["higher_is_better"]:
+            before, after = after, before
+        # How much worse it got, positive for slower.
+        change = after / before - 1 if before else 0
+        regressed = change > threshold
+        regressions += regressed
+        print(
+            f"{'FAIL' if regressed else 'ok':<5}{name:<40}"
+            f"{old[name]['value']:>12.2f}{new[name]['value']:>12.2f} "
+            f"{old[name]['unit']:<5}{change:>+8.1%}"
+        )
+    for name in sorted(old.keys() ^ new.keys()):
+        print(f"     {name:<40} only in {'old' if name in old else 'new'}")
+    print(f"{regressions} regressed more than {threshold:.0%}")
+    return regressions
+
+
+def main():
+    """Run or compare benchmarks."""
+    parser = argparse.ArgumentParser(
+        "suite",
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run benchmarks, save as JSON")
+    run_parser.add_argument("names", nargs="*", help=", ".join(BENCHMARKS))
+    run_parser.add_argument("-o", "--output", default="doge-bench.json")
+
+    compare_parser = commands.add_parser("compare", help="compare two runs")
+    compare_parser.add_argument("old")
+    compare_parser.add_argument("new")
+    compare_parser.add_argument(
+        "--threshold",
+        help="fraction a result may get worse by, default is 0.1",
+        type=float,
+        default=0.1,
+    )
+
+    ns = parser.parse_args()
+    if ns.command == "run" and (unknown := set(ns.names) - BENCHMARKS.keys()):
+        parser.error(f"no such benchmark: {', '.join(sorted(unknown))}")
+    if ns.command == "run":
+        return run(ns.names, ns.output)
+    return compare(ns.old, ns.new, ns.threshold) > 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
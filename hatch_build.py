@@ -0,0 +1,37 @@
+"""Build the Shibe atlas into every wheel of doge."""
+
+# Copyright (C) 2013-2024 Olivia Thiderman
+
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+from hatchling.builders.hooks.plugin.interface import BuildHookInterface
+
+
+class AtlasBuildHook(BuildHookInterface):
+    """Add static/shibes.atlas, built from static/*.txt, to wheels."""
+
+    def initialize(self, version, build_data):  # noqa: ARG002
+        """Write a fresh atlas outside the source tree, and include it."""
+        if self.target_name != "wheel":
+            # An sdist is built into a wheel later on, atlas and all.
+            return
+
+        sys.path.insert(0, str(Path(self.root) / "src"))
+        try:
+            from doge import atlas  # noqa: PLC0415
+
+            # Never next to the text files, where it would shadow any later
+            # edits to them in this checkout.
+            self.atlas_dir = tempfile.mkdtemp(prefix="doge-atlas-")
+            path = atlas.write_atlas(str(Path(self.atlas_dir) / atlas.ATLAS_NAME))
+        finally:
+            sys.path.pop(0)
+        build_data["force_include"][path] = f"doge/static/{atlas.ATLAS_NAME}"
+
+    def finalize(self, version, build_data, artifact_path):  # noqa: ARG002
+        """Remove the atlas, now that it is in the wheel."""
+        if atlas_dir := getattr(self, "atlas_dir", None):
+            shutil.rmtree(atlas_dir, ignore_errors=True)
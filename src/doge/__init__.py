@@ -1 +1,15 @@
 # Copyright (C) 2013-2024 Olivia Thiderman
+"""Wow print Shibe, such random words."""
+
+
+def __getattr__(name):
+    # Only import doge.core when asked, doge-client should stay light.
+    if name == "render":
+        from doge.core import render  # noqa: PLC0415
+
+        return render
+    msg = f"module {__name__!r} has no attribute {name!r}"
+    raise AttributeError(msg)
+
+
+__all__ = ["render"]
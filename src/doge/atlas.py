@@ -0,0 +1,145 @@
+"""Keep all the Shibes in one precompiled atlas file.
+
+The atlas is built from static/*.txt into every wheel (see hatch_build.py),
+or by running `python -m doge.atlas`. It starts with a one line JSON header
+holding the name, height, width and onscreen line lengths of every Shibe,
+followed by the raw art. Loading a Shibe is then a single read or memory map,
+parsing a small header, and decoding just the one Shibe that was asked for,
+without measuring any lines.
+
+The atlas is never written into, or kept with, the source tree, so a
+checkout uses the text files, and never an atlas older than them, unless one
+was built by hand.
+
+If the atlas is missing or does not know a Shibe, the text files are used.
+"""
+
+# Copyright (C) 2013-2024 Olivia Thiderman
+
+import json
+import os
+
+STATIC_DIR = os.path.join(os.path.dirname(__file__), "static")  # noqa: PTH118, PTH120
+ATLAS_NAME = "shibes.atlas"
+
+_atlas = None
+
+
+class Atlas:
+    """A loaded atlas of Shibes."""
+
+    def __init__(self, data):
+        self.data = data
+        start = data.find(b"\n") + 1
+        self.header = json.loads(data[:start])
+        self.start = start
+
+    @property
+    def names(self):
+        """Return the file names of the Shibes in the atlas."""
+        return self.header["names"]
+
+    def load(self, name):
+        """Return the lines of a Shibe, and their onscreen lengths."""
+        shibe = self.header["shibes"][name]
+        offset = self.start + shibe["offset"]
+        text = self.data[offset : offset + shibe["size"]].decode("utf-8")
+        return text.splitlines(keepends=True), shibe["lens"]
+
+
+def read_static(name):
+    """Return the bytes of a file in the static dir.
+
+    This asks the loader of this module, which works the same from a zipapp,
+    instead of importing the rather slow importlib.resources.
+    """
+    return __loader__.get_data(os.path.join(STATIC_DIR, name))  # noqa: PTH118
+
+
+def load_atlas():
+    """Return the atlas, or None if there is none."""
+    global _atlas  # noqa: PLW0603
+    if _atlas is None:
+        try:
+            with open(os.path.join(STATIC_DIR, ATLAS_NAME), "rb") as f:  # noqa: PTH118, PTH123
+                import mmap  # noqa: PLC0415
+
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            # No real file to map, probably running from a zipapp.
+            try:
+                data = read_static(ATLAS_NAME)
+            except OSError:
+                return None
+        _atlas = Atlas(data)
+    return _atlas
+
+
+def shibe_names():
+    """Return the file names of all Shibes."""
+    if atlas := load_atlas():
+        return atlas.names
+    try:
+        names = os.listdir(STATIC_DIR)  # noqa: PTH208
+    except OSError:
+        # In a zipapp, where only importlib.resources can look inside.
+        from importlib.resources import files  # noqa: PLC0415
+
+        names = [file.name for file in files("doge").joinpath("static").iterdir()]
+    return sorted(name for name in names if name.endswith(".txt"))
+
+
+def load_shibe(name):
+    """Return the lines of a Shibe, and their onscreen lengths.
+
+    Lengths include the line break, since that is where messages go.
+    """
+    atlas = load_atlas()
+    if atlas and name in atlas.header["shibes"]:
+        return atlas.load(name)
+
+    from doge.core import clean_len  # noqa: PLC0415
+
+    lines = read_static(name).decode("utf-8").splitlines(keepends=True)
+    return lines, [clean_len(line) for line in lines]
+
+
+def build_atlas():
+    """Return the bytes of an atlas of all Shibes in the static dir."""
+    from doge.core import clean_len  # noqa: PLC0415
+
+    names = sorted(
+        name
+        for name in os.listdir(STATIC_DIR)  # noqa: PTH208
+        if name.endswith(".txt")
+    )
+    header = {"names": names, "shibes": {}}
+    chunks = []
+    offset = 0
+    for name in names:
+        raw = read_static(name)
+        lines = raw.decode("utf-8").splitlines(keepends=True)
+        header["shibes"][name] = {
+            "offset": offset,
+            "size": len(raw),
+            "height": len(lines),
+            "width": max(map(clean_len, lines), default=0),
+            "lens": [clean_len(line) for line in lines],
+        }
+        chunks.append(raw)
+        offset += len(raw)
+    return b"".join(
+        [json.dumps(header, separators=(",", ":")).encode(), b"\n", *chunks]
+    )
+
+
+def write_atlas(path=None):
+    """Build the atlas and write it to the static dir, or to path."""
+    path = path or os.path.join(STATIC_DIR, ATLAS_NAME)  # noqa: PTH118
+    with open(path, "wb") as f:  # noqa: PTH123
+        f.write(build_atlas())
+    return path
+
+
+if __name__ == "__main__":
+    print(f"wow, such atlas: {write_atlas()}")
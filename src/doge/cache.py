@@ -0,0 +1,48 @@
+"""Keep small bits of Shibe state around between runs.
+
+Everything here is best effort: a missing, stale or unwritable cache just
+means doge has to do the work again, never that it fails.
+"""
+
+# Copyright (C) 2013-2024 Olivia Thiderman
+
+import contextlib
+import json
+import os
+import threading
+from pathlib import Path
+
+from doge import phases
+
+
+def cache_dir():
+    """Return the doge cache dir, following the XDG base directory spec."""
+    base = os.getenv("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "doge"
+
+
+@phases.timed("cache read")
+def read_json(name):
+    """Return the cached data stored under name, or None if there is none."""
+    try:
+        with (cache_dir() / name).open(encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+@phases.timed("cache write")
+def write_json(name, data):
+    """Atomically replace the cached data stored under name."""
+    directory = cache_dir()
+    with contextlib.suppress(OSError):
+        directory.mkdir(parents=True, exist_ok=True)
+        # Write next to the target and rename, so that concurrent logins and
+        # threads never see a half written file.
+        tmp = directory / f".{name}.{os.getpid()}.{threading.get_ident()}"
+        try:
+            with tmp.open("w", encoding="utf-8") as f:
+                json.dump(data, f, separators=(",", ":"))
+            tmp.replace(directory / name)
+        finally:
+            tmp.unlink(missing_ok=True)
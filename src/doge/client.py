@@ -0,0 +1,99 @@
+"""Ask a running `doge --serve` for Shibe, wow.
+
+This is what logins should call. It only imports what is needed to talk to
+the daemon, and falls back to rendering doge in-process whenever there is no
+daemon around or it can not help.
+"""
+
+# Copyright (C) 2013-2024 Olivia Thiderman
+
+import json
+import os
+import socket
+import sys
+
+TIMEOUT = 2.0
+
+
+def socket_path():
+    """Return where the doge daemon of the current user listens."""
+    base = os.getenv("XDG_RUNTIME_DIR") or os.path.join(  # noqa: PTH118
+        os.getenv("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"),  # noqa: PTH111
+        "doge",
+    )
+    return os.path.join(base, "doge.sock")  # noqa: PTH118
+
+
+def env_size(name):
+    """Return a positive size from the environment, or 0 if it has none."""
+    try:
+        return max(int(os.getenv(name, "0")), 0)
+    except ValueError:
+        return 0
+
+
+def terminal_size():
+    """Return the terminal size, the same way shutil.get_terminal_size does."""
+    try:
+        columns, lines = os.get_terminal_size(sys.__stdout__.fileno())
+    except (AttributeError, ValueError, OSError):
+        columns, lines = 0, 0
+    columns = env_size("COLUMNS") or columns or 80
+    lines = env_size("LINES") or lines or 24
+    return columns, lines
+
+
+def request_doge(args):
+    """Send a request to the daemon and stream the frame it sends to stdout.
+
+    Return False if nothing was received, in which case nothing was printed.
+    """
+    width, height = terminal_size()
+    request = {
+        "args": args,
+        "width": width,
+        "height": height,
+        "pretty": sys.stdout.isatty(),
+        "prompt_height": len(os.getenv("PS1", "").split("\n")) + 1,
+    }
+    received = False
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(TIMEOUT)
+        sock.connect(socket_path())
+        sock.sendall(json.dumps(request).encode() + b"\n")
+        try:
+            while chunk := sock.recv(1 << 16):
+                sys.stdout.buffer.write(chunk)
+                received = True
+        except OSError:
+            # Half a Shibe is better than two of them.
+            if not received:
+                raise
+    sys.stdout.flush()
+    return received
+
+
+def main():
+    """Print doge, preferably rendered by the daemon."""
+    args = sys.argv[1:]
+    # The daemon can not read our stdin, and only speaks UTF-8.
+    can_serve = (
+        hasattr(socket, "AF_UNIX")
+        and (sys.stdin is None or sys.stdin.isatty())
+        and (sys.stdout.encoding or "").lower().replace("-", "") == "utf8"
+        and "--serve" not in args
+    )
+    if can_serve:
+        try:
+            if request_doge(args):
+                return 0
+        except OSError:
+            pass
+
+    from doge import core  # noqa: PLC0415
+
+    return core.main()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
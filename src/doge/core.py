@@ -6,44 +6,82 @@
 
 import argparse
 import contextlib
-import datetime
-import getpass
+import functools
+import itertools
 import os
-import platform
 import random
 import re
 import shutil
-import subprocess
 import sys
-import traceback
-import unicodedata
-from importlib.resources import files
-from pathlib import Path
+import time
 
-import dateutil.tz
+from doge import atlas, corpus, draws, phases, wow
 
-from doge import wow
+# Modules that are only needed on some code paths, like subprocess, platform
+# and the season calendar, are imported where they are used. doge runs on
+# every login, so startup time matters more than import tidiness here.
 
-ROOT = files("doge").joinpath("static")
 DEFAULT_DOGE = "doge.txt"
 
 
 class Doge:
-    """Make Shibe and pretty random words."""
+    """Make Shibe and pretty random words.
+
+    All state that changes while rendering lives on the instance, so separate
+    Doges can render in separate threads. A single Doge is not thread safe.
+    """
 
     MAX_PERCENT = 100
     MIN_PS_LEN = 2
-
-    def __init__(self, tty, ns):
+    # Home directories can be huge, or on a slow network mount, so only look
+    # at this many entries, for at most this many seconds.
+    MAX_HOME_ENTRIES = 10_000
+    MAX_HOME_SECONDS = 0.05
+    # Sources of system data worth caching, and how many seconds to cache them.
+    CACHED_SOURCES = {  # noqa: RUF012
+        "user": 7 * 24 * 60 * 60,
+        "uname": 24 * 60 * 60,
+        "os_release": 24 * 60 * 60,
+        "process": 5 * 60,
+    }
+    # How many process names to cache, a couple of them are picked every run.
+    PROCESS_POOL = 32
+    # Words to keep from stdin or --input, for every message of this many
+    # frames of --watch, but never more than MAX_SAMPLE of them.
+    WATCH_FRAMES = 1000
+    MAX_SAMPLE = 100_000
+    # Split --input files into this many shards per job, so that all the jobs
+    # keep busy until the end, even when some shards are slower than others.
+    SHARDS_PER_JOB = 4
+
+    def __init__(self, tty, ns, rng=None):
         self.tty = tty
         self.ns = ns
+        # All randomness comes from here, and every doge has its own deques
+        # drawing from it, so doges never affect each other. With --seed, the
+        # same words make the same frames.
+        self.rng = rng or random.Random(ns.seed)
+        self.prefixes = wow.DogeDeque(*wow.PREFIXES, rng=self.rng)
+        self.suffixes = wow.DogeDeque(*wow.SUFFIXES, rng=self.rng)
+        self.colors = wow.DogeDeque(*wow.COLORS, rng=self.rng)
         self.lines = []
-        self.doge_path = ROOT.joinpath(ns.doge_path or DEFAULT_DOGE)
+        self.line_lens = []
+        self.frame = []
+        self.doge = []
+        self.doge_lens = []
+        self.doge_path = ns.doge_path or DEFAULT_DOGE
         if ns.frequency:
             # such frequency based
-            self.words = wow.FrequencyBasedDogeDeque(*wow.WORD_LIST, step=ns.step)
+            self.words = wow.FrequencyBasedDogeDeque(
+                *wow.WORD_LIST, step=ns.step, rng=self.rng
+            )
+        elif ns.weighted:
+            # very likely, much often
+            self.words = wow.WeightedDogeDeque(
+                *wow.WORD_LIST, exponent=ns.exponent, rng=self.rng
+            )
         else:
-            self.words = wow.DogeDeque(*wow.WORD_LIST)
+            self.words = wow.DogeDeque(*wow.WORD_LIST, rng=self.rng)
 
     def setup(self):
         """Check args and seasons, load data, and decorate shibe."""
@@ -52,12 +90,11 @@ class Doge:
 
         if self.tty.pretty:
             # stdout is a tty, load Shibe and calculate how wide he is
-            doge = self.load_doge()
-            max_doge = max(map(clean_len, doge)) + 15
+            self.doge, self.doge_lens = self.load_doge()
         else:
             # stdout is being piped and we should not load Shibe
-            doge = []
-            max_doge = 15
+            self.doge = []
+            self.doge_lens = []
 
         if self.ns.density > self.MAX_PERCENT:
             sys.stderr.write("wow, density such over 100%, too high\n")
@@ -67,33 +104,62 @@ class Doge:
             sys.stderr.write("wow, density such negative, too low\n")
             sys.exit(1)
 
-        if self.tty.width < max_doge:
+        if self.ns.count < 1:
+            sys.stderr.write("wow, count such nothing, too low\n")
+            sys.exit(1)
+
+        if self.ns.watch and self.ns.fps <= 0:
+            sys.stderr.write("wow, fps such standstill, too low\n")
+            sys.exit(1)
+
+        if self.ns.exponent < 0:
+            sys.stderr.write("wow, exponent such negative, too low\n")
+            sys.exit(1)
+
+        if self.ns.budget_ms < 0:
+            sys.stderr.write("wow, budget such negative, too low\n")
+            sys.exit(1)
+
+        if not self.setup_lines():
             # Shibe won't fit, so abort.
             sys.stderr.write("wow, such small terminal\n")
-            sys.stderr.write(f"no doge under {max_doge} column\n")
+            sys.stderr.write(f"no doge under {self.min_width()} column\n")
             return False
 
-        # Check for prompt height so that we can fill the screen minus how high
-        # the prompt will be when done.
-        prompt = os.getenv("PS1", "").split("\n")
-        line_count = len(prompt) + 1
-
-        # Create a list filled with empty lines and Shibe at the bottom.
-        fill = range(self.tty.height - len(doge) - line_count)
-        self.lines = ["\n" for x in fill]
-        self.lines += doge
+        # Try to fetch data from --input files, or else fed thru stdin
+        had_input = self.get_input_data() or self.get_stdin_data()
 
-        # Try to fetch data fed thru stdin
-        had_stdin = self.get_stdin_data()
-
-        # Get some system data, but only if there was nothing in stdin
-        if not had_stdin:
+        # Get some system data, but only if there was no input
+        if not had_input:
             self.get_real_data()
 
         # Apply the text around Shibe
         self.apply_text()
         return True
 
+    def min_width(self):
+        """Return how wide the terminal needs to be for Shibe and a message."""
+        return max(self.doge_lens, default=0) + 15
+
+    @phases.timed("lines")
+    def setup_lines(self):
+        """Fill the terminal with empty lines and Shibe at the bottom.
+
+        Return False, leaving no lines at all, if Shibe won't fit.
+        """
+        if self.tty.width < self.min_width():
+            self.lines = []
+            self.line_lens = []
+            return False
+
+        # Leave room for how high the prompt will be when done. Keep the
+        # onscreen length of every line around for placing messages later.
+        fill = max(self.tty.height - len(self.doge) - self.tty.prompt_height, 0)
+        self.lines = ["\n"] * fill + self.doge
+        self.line_lens = [1] * fill + self.doge_lens
+        return True
+
+    @phases.timed("season")
     def setup_seasonal(self):
         """Handle seasonal holidays.
 
@@ -101,7 +167,8 @@ class Doge:
         Shibe picture and load holiday words.
 
         Note: if there are two or more holidays defined for a certain date,
-        the first one takes precedence.
+        the first one takes precedence. See doge.season for how the dates are
+        resolved and cached.
         """
         # If we've specified a season, just run that one
         if self.ns.season:
@@ -112,24 +179,11 @@ class Doge:
         if self.ns.doge_path is not None and not self.ns.no_shibe:
             return None
 
-        tz = dateutil.tz.tzlocal()
-        now = datetime.datetime.now(tz=tz)
+        from doge.season import current_season  # noqa: PLC0415
 
-        for season, data in wow.SEASONS.items():
-            start, end = data["dates"]
-            start_dt = datetime.datetime(now.year, start[0], start[1], tzinfo=tz)
-
-            # Be sane if the holiday season spans over New Year's day.
-            end_dt = datetime.datetime(
-                now.year + 1 if start[0] > end[0] else now.year,
-                end[0],
-                end[1],
-                tzinfo=tz,
-            )
-
-            if start_dt <= now <= end_dt:
-                # Wow, much holiday!
-                return self.load_season(season)
+        if season := current_season(self.ns.date):
+            # Wow, much holiday!
+            return self.load_season(season)
         return None
 
     def load_season(self, season_key):
@@ -138,77 +192,220 @@ class Doge:
             return
 
         season = wow.SEASONS[season_key]
-        self.doge_path = ROOT.joinpath(season["pic"])
+        self.doge_path = season["pic"]
         self.words.extend(season["words"])
 
-    def apply_text(self):
-        """Apply text around doge."""
-        # Calculate a random sampling of lines that are to have text applied
-        # onto them. Return value is a sorted list of line index integers.
-        line_len = len(self.lines)
+    def message_count(self):
+        """Return how many lines will have text applied onto them."""
+        return int(len(self.lines) * (self.ns.density / 100))
 
-        if self.ns.density == 0:
-            return
+    def sample_size(self):
+        """Return how many words to keep from stdin or --input.
 
-        affected = sorted(
-            random.sample(range(line_len), int(line_len * (self.ns.density / 100)))
-        )
+        Every frame of --count, or WATCH_FRAMES frames of --watch, gets words
+        of its own, as far as MAX_SAMPLE goes. The words are a shuffle bag, so
+        no word comes up again until all of them have.
+        """
+        if self.ns.pack:
+            from doge import placement  # noqa: PLC0415
 
-        for i, target in enumerate(affected, start=1):
-            line = self.lines[target]
-            line = re.sub("\n", " ", line)
+            per_frame = placement.message_count(self)
+        else:
+            per_frame = self.message_count()
+        frames = self.WATCH_FRAMES if self.ns.watch else self.ns.count
+        return max(per_frame, min(per_frame * frames, self.MAX_SAMPLE))
 
-            word = self.words.get()
+    @phases.timed("apply text")
+    def apply_text(self):
+        """Apply text around doge.
+
+        The result is kept in self.frame, one string per line, leaving
+        self.lines untouched. All random draws of the frame are made up front,
+        in batches (see doge.draws), and only the lines that get a message are
+        made anew.
+        """
+        if self.ns.pack:
+            from doge import placement  # noqa: PLC0415
+
+            self.frame = placement.pack(self)
+            return
 
-            # If first or last line, or a random selection, use standalone wow.
-            if i == 1 or i == len(affected) or random.choice(range(20)) == 0:
-                word = "wow"
+        self.frame = self.lines.copy()
+        count = self.message_count()
+        if count == 0:
+            return
 
-            # Generate a new DogeMessage, possibly based on a word.
-            self.lines[target] = DogeMessage(self, line, word).generate()
+        draw = draws.draws_for(self.rng, len(self.lines))
+        # The sorted indexes of the lines that get a message.
+        affected = draw.rows(len(self.lines), count)
+
+        # First and last lines, and a random selection, get a standalone wow.
+        words = self.words.take(count)
+        for i, roll in enumerate(draw.below(20, count)):
+            if roll == 0:
+                words[i] = "wow"
+        words[0] = words[-1] = "wow"
+
+        message = DogeMessage(self)
+        texts = message.texts(words, draw)
+        intervals = [
+            self.tty.width - onscreen_len(text) - self.line_lens[target]
+            for target, text in zip(affected, texts)
+        ]
+        spacers = draw.spacers(intervals)
+        colors = self.colors.take(count) if self.tty.pretty else [None] * count
+
+        for target, text, interval, spacer, color in zip(
+            affected, texts, intervals, spacers, colors
+        ):
+            self.frame[target] = message.format(
+                self.lines[target], text, spacer if interval > 0 else None, color
+            )
 
+    @phases.timed("load doge")
     def load_doge(self):
-        """Return pretty ASCII Shibe.
+        """Return pretty ASCII Shibe, and the onscreen length of his lines.
 
         wow
         """
         if self.ns.no_shibe:
-            return [""]
+            return [""], [0]
 
-        return self.doge_path.read_text(encoding="utf-8").splitlines(keepends=True)
+        return atlas.load_shibe(self.doge_path)
 
     def get_real_data(self):
         """Grab actual data from the system."""
+        self.words.extend(self.gather_real_data())
+
+    def gather_real_data(self):
+        """Return lowercased words based on actual data from the system.
+
+        Sources that rarely change are cached on disk for their time to live in
+        CACHED_SOURCES, unless --refresh is given. The editor and the files in
+        $HOME are cheap to get, and picked anew every time.
+
+        Whatever has to be fetched is fetched concurrently, and any source
+        that is not done within --budget-ms is left out.
+        """
+        from doge import cache  # noqa: PLC0415
+
+        cache_name = system_cache_name()
+        cached = {} if self.ns.refresh else read_system_cache(cache_name)
+        now = time.time()
+        # The jobs run at the same time, so the ones picking at random get a
+        # random.Random of their own, seeded in a fixed order. That way --seed
+        # gives the same picks, whichever job happens to run first.
+        process_rng = random.Random(self.rng.getrandbits(64))
+        home_rng = random.Random(self.rng.getrandbits(64))
+        jobs = {}
+        for source, ttl in self.CACHED_SOURCES.items():
+            at, words = cached.get(source) or (0, None)
+            if words is None or not 0 <= now - at < ttl:
+                jobs[source] = getattr(self, f"get_{source}_words")
+        if "process" in jobs:
+            jobs["process"] = functools.partial(jobs["process"], rng=process_rng)
+        jobs["home"] = functools.partial(self.get_home_files, count=1, rng=home_rng)
+        fetched = self.run_within_budget(jobs)
+        home = fetched.pop("home", [])
+        for source, words in fetched.items():
+            cached[source] = (now, words)
+
         ret = []
-        with contextlib.suppress(OSError):
-            if username := getpass.getuser():
-                ret.append(username)
+        for source in self.CACHED_SOURCES:
+            # Sources that missed the budget make do with stale words, if any.
+            _, words = cached.get(source) or (0, [])
+
+            if source == "process":
+                # Grab some processes
+                ret += self.rng.sample(words, min(len(words), 2))
+            else:
+                ret += words
+
+        if fetched:
+            cache.write_json(cache_name, cached)
 
         if words := os.getenv("EDITOR", "").split():
             editor = words[0].split("/")[-1]
             ret.append(editor)
 
-        # OS, hostname and... architecture (because lel)
+        # Actual files from $HOME.
+        ret += home
+
+        # Prepare the returned data. First, lowercase it.
+        return [x.lower() for x in ret]
+
+    def run_within_budget(self, jobs):
+        """Run {name: function} jobs in threads, and return what they returned.
+
+        Jobs that are not done within --budget-ms are left out. Their threads
+        are daemons, so a source stuck on a slow network mount never keeps
+        doge from exiting. Jobs must not share any state, such as self.rng.
+        """
+        import queue  # noqa: PLC0415
+        import threading  # noqa: PLC0415
+
+        deadline = time.monotonic() + self.ns.budget_ms / 1000
+        done = queue.SimpleQueue()
+
+        def run(name, job):
+            result = None
+            try:
+                result = job()
+            finally:
+                done.put((name, result))
+
+        for name, job in jobs.items():
+            threading.Thread(target=run, args=(name, job), daemon=True).start()
+
+        results = {}
+        for _ in jobs:
+            try:
+                name, result = done.get(timeout=max(deadline - time.monotonic(), 0))
+            except queue.Empty:
+                break
+            if result is not None:
+                results[name] = result
+        return results
+
+    @staticmethod
+    @phases.timed("user")
+    def get_user_words():
+        """Grab the name of the current user."""
+        import getpass  # noqa: PLC0415
+
+        with contextlib.suppress(OSError):
+            if username := getpass.getuser():
+                return [username]
+        return []
+
+    @staticmethod
+    @phases.timed("uname")
+    def get_uname_words():
+        """Grab the OS, hostname and... architecture (because lel)."""
+        import platform  # noqa: PLC0415
+
         uname = (platform.system(), platform.node(), platform.machine())
-        ret.extend(x for x in uname if x)
+        return [x for x in uname if x]
+
+    @staticmethod
+    @phases.timed("os release")
+    def get_os_release_words():
+        """Grab the ID of the Linux distribution."""
+        import platform  # noqa: PLC0415
+
         with contextlib.suppress(OSError):
             if (
                 hasattr(platform, "freedesktop_os_release")  # new in Python 3.10
                 and (os_release := platform.freedesktop_os_release())
                 and (os_id := os_release.get("ID"))
             ):
-                ret.append(os_id)
-
-        # Grab actual files from $HOME.
-        filenames = [x.name for x in Path.home().iterdir()]
-        if filenames:
-            ret.append(random.choice(filenames))
-
-        # Grab some processes
-        ret += self.get_processes()[:2]
+                return [os_id]
+        return []
 
-        # Prepare the returned data. First, lowercase it.
-        self.words.extend(map(str.lower, ret))
+    @phases.timed("processes")
+    def get_process_words(self, rng=None):
+        """Grab a pool of process names to pick from."""
+        return self.get_processes(count=self.PROCESS_POOL, rng=rng)
 
     @staticmethod
     def filter_words(words, stopwords, min_length):
@@ -217,34 +414,150 @@ class Doge:
             word for word in words if len(word) >= min_length and word not in stopwords
         ]
 
+    @phases.timed("stdin")
     def get_stdin_data(self):
-        """Get words from stdin."""
+        """Get words from stdin.
+
+        Stdin is tokenised in chunks as it streams in. Unless we need the
+        frequency of every word, only a uniform sample of as many words as
+        the frames need is kept (see sample_size()), so memory use does not
+        grow with the size of the input.
+        """
         if not self.tty.in_is_pipe:
             # No pipez found
             return False
 
-        stdin_lines = (line for line in sys.stdin.readlines())
+        self.use_word_chunks(corpus.iter_word_chunks(sys.stdin))
+        return True
+
+    @phases.timed("input")
+    def get_input_data(self):
+        """Get words from the --input files.
+
+        Files are memory mapped and tokenised in big chunks (see doge.corpus),
+        and otherwise handled just like stdin. When the frequency of every word
+        is needed, big files are counted shard by shard in --jobs processes.
+        """
+        if not self.ns.input:
+            return False
+
+        try:
+            shards = []
+            if (self.ns.frequency or self.ns.weighted) and self.ns.jobs > 1:
+                shards = [
+                    (path, start, end, self.ns.filter_stopwords, self.ns.min_length)
+                    for path in self.ns.input
+                    for start, end in corpus.file_shards(
+                        path, self.ns.jobs * self.SHARDS_PER_JOB
+                    )
+                ]
+            if len(shards) > 1:
+                self.count_shards(shards)
+            else:
+                self.use_word_chunks(
+                    itertools.chain.from_iterable(
+                        corpus.iter_file_word_chunks(path) for path in self.ns.input
+                    )
+                )
+        except OSError as e:
+            sys.stderr.write(f"wow, such unreadable {e.filename}: {e.strerror}\n")
+            sys.exit(1)
+        return True
 
-        rx_word = re.compile(r"\w+", re.UNICODE)
+    def count_shards(self, shards):
+        """Count the words in shards of the --input files, in --jobs processes.
 
-        # If we have stdin data, we should remove everything else!
+        Every shard is counted on its own, see count_shard(). The counts are
+        merged in shard order, which gives the very same counts, in the very
+        same order, as counting everything in one go.
+        """
+        import collections  # noqa: PLC0415
+        import multiprocessing  # noqa: PLC0415
+
+        counts = collections.Counter()
+        with multiprocessing.Pool(min(self.ns.jobs, len(shards))) as pool:
+            for shard_counts in pool.imap(count_shard, shards):
+                counts.update(shard_counts)
+
+        # If we have input, we should remove everything else!
         self.words.clear()
-        word_list = [
-            match.group(0)
-            for line in stdin_lines
-            for match in rx_word.finditer(line.lower())
-        ]
+        self.words.extend(counts)
+
+    def use_word_chunks(self, word_chunks):
+        """Replace the words with those in an iterable of word lists."""
         if self.ns.filter_stopwords:
-            word_list = self.filter_words(
-                word_list, stopwords=wow.STOPWORDS, min_length=self.ns.min_length
+            word_chunks = (
+                self.filter_words(
+                    chunk, stopwords=wow.STOPWORDS, min_length=self.ns.min_length
+                )
+                for chunk in word_chunks
             )
+        word_list = itertools.chain.from_iterable(word_chunks)
+
+        if not (self.ns.frequency or self.ns.weighted):
+            word_list = corpus.reservoir_sample(word_list, self.sample_size(), self.rng)
 
+        # If we have input, we should remove everything else!
+        self.words.clear()
         self.words.extend(word_list)
 
-        return True
+    @phases.timed("home")
+    def get_home_files(self, count, rng=None):
+        """Grab a random sample of file names in $HOME.
+
+        The sample is taken in a single pass over the directory, which gives up
+        after MAX_HOME_ENTRIES entries or MAX_HOME_SECONDS seconds and samples
+        from what it has seen so far. It is drawn from rng, or else self.rng.
+        """
+        deadline = time.monotonic() + self.MAX_HOME_SECONDS
+
+        def names(entries):
+            for entry in itertools.islice(entries, self.MAX_HOME_ENTRIES):
+                yield entry.name
+                if time.monotonic() > deadline:
+                    return
+
+        try:
+            with os.scandir(os.path.expanduser("~")) as entries:  # noqa: PTH111
+                return corpus.reservoir_sample(names(entries), count, rng or self.rng)
+        except OSError:
+            return []
+
+    def get_processes(self, count=None, rng=None):
+        """Grab a shuffled list of currently running process names.
+
+        If count is given, at most that many names are returned. On Linux, this
+        reads /proc directly and stops as soon as it has enough names, instead
+        of forking ps and looking at every process. The shuffling is drawn
+        from rng, or else self.rng.
+        """
+        rng = rng or self.rng
+        try:
+            pids = [entry.name for entry in os.scandir("/proc") if entry.name.isdigit()]
+        except OSError:
+            pids = []
+        if not pids:
+            return self.get_ps_processes(rng)[:count]
+
+        rng.shuffle(pids)
+        processes = {}
+        for pid in pids:
+            try:
+                with open(f"/proc/{pid}/comm", encoding="utf-8", errors="replace") as f:  # noqa: PTH123
+                    comm = f.read().rstrip("\n")
+            except OSError:
+                # Such process, much gone
+                continue
+            if name := self.process_name(comm):
+                processes[name] = None
+                if len(processes) == count:
+                    break
+        return list(processes)
+
+    def get_ps_processes(self, rng=None):
+        """Grab a shuffled list of all currently running process names from ps."""
+        import subprocess  # noqa: PLC0415
 
-    def get_processes(self):
-        """Grab a shuffled list of all currently running process names."""
         processes = set()
         try:
             # POSIX ps, so it should work in most environments where doge would
@@ -253,71 +566,250 @@ class Doge:
                 capture_output=True,
                 text=True,
                 check=True,
+                # Nothing later than the budget gets used anyway.
+                timeout=self.ns.budget_ms / 1000,
             )
 
             for comm in result.stdout.splitlines():
-                name = comm.split("/")[-1]
-                # Filter short and weird ones
-                if name and len(name) >= self.MIN_PS_LEN and ":" not in name:
+                if name := self.process_name(comm):
                     processes.add(name)
 
-        except (OSError, subprocess.CalledProcessError):
+        except (OSError, subprocess.SubprocessError):
             pass
 
-        proc_list = list(processes)
-        random.shuffle(proc_list)
+        proc_list = sorted(processes)
+        (rng or self.rng).shuffle(proc_list)
         return proc_list
 
+    def process_name(self, comm):
+        """Return the name of a process command, or None if it is no good."""
+        name = comm.split("/")[-1]
+        # Filter short and weird ones
+        if name and len(name) >= self.MIN_PS_LEN and ":" not in name:
+            return name
+        return None
+
+    @phases.timed("print")
     def print_doge(self):
-        """Print doge to terminal."""
-        for line in self.lines:
-            sys.stdout.write(line)
+        """Print doge to terminal, in one go."""
+        sys.stdout.write("".join(self.frame))
         sys.stdout.flush()
 
+    def watch(self):
+        """Keep printing new doge frames at --fps, until interrupted.
 
-class DogeMessage:
-    """Make a randomly placed and randomly colored message."""
+        Only the messages are generated anew for every frame. On a terminal,
+        only the lines that changed are redrawn, in place, and the terminal
+        size is checked again whenever it gets resized. Anywhere else, whole
+        frames are printed one after the other (wow, lolcat).
+        """
+        import signal  # noqa: PLC0415
 
-    def __init__(self, doge, occupied, word):
-        self.doge = doge
-        self.tty = doge.tty
-        self.occupied = occupied
-        self.word = word
+        resized = False
 
-    def generate(self):
-        """Add a word to a line, with color, random prefix and suffix."""
-        if self.word == "wow":
-            # Standalone wow. Don't apply any prefixes or suffixes.
-            msg = self.word
+        def on_resize(_signum, _frame):
+            nonlocal resized
+            resized = True
+
+        if self.tty.out_is_tty and hasattr(signal, "SIGWINCH"):
+            signal.signal(signal.SIGWINCH, on_resize)
+            # Hide the cursor and clear the screen.
+            sys.stdout.write("\x1b[?25l\x1b[2J")
+
+        interval = 1 / self.ns.fps
+        next_frame = time.monotonic()
+        drawn = []
+        try:
+            while True:
+                if resized:
+                    resized = False
+                    self.tty.width, self.tty.height = shutil.get_terminal_size()
+                    apply_max_size(self.tty, self.ns)
+                    self.setup_lines()
+                    drawn = []
+                    sys.stdout.write("\x1b[2J")
+
+                self.apply_text()
+                if self.tty.out_is_tty:
+                    sys.stdout.write(self.redraw(drawn))
+                    drawn = self.frame
+                else:
+                    sys.stdout.write("".join(self.frame))
+                sys.stdout.flush()
+
+                # Keep a steady frame rate, without trying to catch up on
+                # frames that were late.
+                now = time.monotonic()
+                next_frame = max(next_frame + interval, now)
+                time.sleep(max(next_frame - now, 0))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if self.tty.out_is_tty:
+                # Show the cursor again, below Shibe.
+                sys.stdout.write(f"\x1b[0m\x1b[{len(self.frame)};1H\n\x1b[?25h")
+                sys.stdout.flush()
+
+    def print_frames(self):
+        """Print --count frames, each with messages of its own.
+
+        Frames are separated by --delimiter, or printed as one JSON object per
+        line with --ndjson. They are rendered in batches, each seeded from our
+        own rng (see render_batch()). With --jobs, the batches are rendered by
+        a pool of worker processes, each with a copy of this already set up
+        doge, so --seed gives the same frames with any number of jobs. How
+        fast it all went is reported to stderr.
+        """
+        count = self.ns.count
+        started = time.perf_counter()
+        sizes = [BATCH_SIZE] * (count // BATCH_SIZE)
+        if count % BATCH_SIZE:
+            sizes.append(count % BATCH_SIZE)
+        batches = [(self.rng.getrandbits(64), size) for size in sizes]
+        if self.ns.jobs > 1 and len(batches) > 1:
+            import multiprocessing  # noqa: PLC0415
+
+            with multiprocessing.Pool(
+                self.ns.jobs, initializer=init_batch_worker, initargs=(self,)
+            ) as pool:
+                self.write_frames(
+                    itertools.chain.from_iterable(pool.imap(render_batch, batches))
+                )
         else:
-            # Add a prefix.
-            msg = f"{wow.PREFIXES.get()} {self.word}"
+            self.write_frames(
+                itertools.chain.from_iterable(map(self.render_batch, batches))
+            )
 
-            # Seldomly add a suffix as well.
-            if random.choice(range(15)) == 0:
-                msg += f" {wow.SUFFIXES.get()}"
+        elapsed = time.perf_counter() - started
+        sys.stderr.write(
+            f"wow, {count} frames in {elapsed:.2f}s, "
+            f"{count / elapsed if elapsed else 0:.0f} frames/s\n"
+        )
 
-        # Calculate the maximum possible spacer
-        interval = self.tty.width - onscreen_len(msg)
-        interval -= clean_len(self.occupied)
+    def render_batch(self, batch):
+        """Render a (seed, count) batch of frames, and return them.
 
-        if interval < 1:
-            # The interval is too low, so the message can not be shown without
-            # spilling over to the subsequent line, borking the setup.
-            # Return the doge slice that was in this row if there was one,
-            # and a line break, effectively disabling the row.
-            return self.occupied + "\n"
+        Every batch starts from a copy of this doge as it was set up, and the
+        batch decides where the randomness starts, so a batch renders the
+        same frames wherever and whenever it is rendered.
+        """
+        import copy  # noqa: PLC0415
 
-        # Apply spacing
-        spacer = " " * random.choice(range(interval))
-        msg = f"{spacer}{msg}"
+        seed, count = batch
+        doge = copy.deepcopy(self)
+        doge.rng.seed(seed)
+        return [doge.render_frame() for _ in range(count)]
 
-        if self.tty.pretty:
+    def render_frame(self):
+        """Apply new text around doge, and return the whole frame."""
+        self.apply_text()
+        return "".join(self.frame)
+
+    def write_frames(self, frames):
+        """Write frames to stdout, delimited or as NDJSON."""
+        if self.ns.ndjson:
+            import json  # noqa: PLC0415
+
+            for frame in frames:
+                sys.stdout.write(json.dumps({"frame": frame}) + "\n")
+        else:
+            for i, frame in enumerate(frames):
+                if i:
+                    sys.stdout.write(self.ns.delimiter)
+                sys.stdout.write(frame)
+        sys.stdout.flush()
+
+    def redraw(self, drawn):
+        """Return escapes redrawing the lines of the frame that changed.
+
+        drawn is the previous frame as it is on screen.
+        """
+        buf = []
+        for i, line in enumerate(self.frame):
+            if i >= len(drawn) or drawn[i] != line:
+                # Move to the line, draw it, and clear what is left of the old
+                # one.
+                text = line.rstrip("\n")
+                buf.append(f"\x1b[{i + 1};1H{text}\x1b[0m\x1b[K")
+        return "".join(buf)
+
+
+# Pretty ANSI color coding for every color Shibe uses.
+COLOR_CODES = {color: f"\x1b[1m\x1b[38;5;{color}m" for color in wow.COLORS}
+
+
+class DogeMessage:
+    """Make randomly placed and randomly colored messages.
+
+    Everything that does not depend on the word, such as the padding and the
+    ANSI color escapes, is prepared once and then reused for every message.
+    """
+
+    RESET = "\x1b[39m\x1b[0m"
+
+    def __init__(self, doge):
+        self.doge = doge
+        self.tty = doge.tty
+        self.rng = doge.rng
+        self.spaces = " " * self.tty.width
+
+    def text(self, word):
+        """Return the text of a message, with a random prefix and suffix."""
+        if word == "wow":
+            # Standalone wow. Don't apply any prefixes or suffixes.
+            return word
+
+        # Add a prefix.
+        msg = f"{self.doge.prefixes.get()} {word}"
+
+        # Seldomly add a suffix as well.
+        if self.rng.randrange(15) == 0:
+            msg = f"{msg} {self.doge.suffixes.get()}"
+        return msg
+
+    def texts(self, words, draw):
+        """Return the texts of many messages, drawing from doge.draws."""
+        plain = sum(word != "wow" for word in words)
+        prefixes = iter(self.doge.prefixes.take(plain))
+        rolls = draw.below(15, plain)
+        suffixes = iter(self.doge.suffixes.take(rolls.count(0)))
+        rolls = iter(rolls)
+
+        texts = []
+        for word in words:
+            if word == "wow":
+                texts.append(word)
+                continue
+            msg = f"{next(prefixes)} {word}"
+            if next(rolls) == 0:
+                msg = f"{msg} {next(suffixes)}"
+            texts.append(msg)
+        return texts
+
+    def format(self, line, msg, spacer, color):
+        """Return a line with a message, spacer columns after what is on it.
+
+        A spacer of None means that the message does not fit, and color is a
+        key of COLOR_CODES, or None for no color.
+        """
+        # Whatever is on the line is kept, and its line break becomes the space
+        # between it and the message.
+        occupied = f"{line[:-1]} " if line.endswith("\n") else line
+
+        if spacer is None:
+            # The message can not be shown without spilling over to the
+            # subsequent line, borking the setup. Keep the doge slice that was
+            # in this row if there was one, and a line break, effectively
+            # disabling the row.
+            return f"{occupied}\n"
+
+        if color is not None:
             # Apply pretty ANSI color coding.
-            msg = f"\x1b[1m\x1b[38;5;{wow.COLORS.get()}m{msg}\x1b[39m\x1b[0m"
+            color = COLOR_CODES[color]
+            return f"{occupied}{color}{self.spaces[:spacer]}{msg}{self.RESET}\n"
 
         # Line ends are pretty cool guys, add one of those.
-        return f"{self.occupied}{msg}\n"
+        return f"{occupied}{self.spaces[:spacer]}{msg}\n"
 
 
 class TTYHandler:
@@ -329,6 +821,7 @@ class TTYHandler:
         self.in_is_pipe = False
         self.out_is_tty = True
         self.pretty = True
+        self.prompt_height = 2
 
     def setup(self):
         """Calculate terminal properties."""
@@ -336,6 +829,10 @@ class TTYHandler:
         self.in_is_pipe = (not sys.stdin.isatty()) if sys.stdin else False
         self.out_is_tty = sys.stdout.isatty()
 
+        # Check for prompt height so that we can fill the screen minus how high
+        # the prompt will be when done.
+        self.prompt_height = len(os.getenv("PS1", "").split("\n")) + 1
+
         self.pretty = self.out_is_tty
         if sys.platform == "win32":
             colorterm = os.getenv("COLORTERM", "").lower()
@@ -346,23 +843,90 @@ class TTYHandler:
             )
 
 
+def system_cache_name():
+    """Return the name of the system data cache of this host and user."""
+    host = os.uname().nodename if hasattr(os, "uname") else os.getenv("COMPUTERNAME")
+    user = os.getenv("USER") or os.getenv("USERNAME") or os.getenv("LOGNAME")
+    return f"system-{host or 'host'}-{user or 'user'}.json"
+
+
+def read_system_cache(name):
+    """Return the {source: [time, words]} entries of a system data cache.
+
+    The file may have been mangled by anything, so entries that are not a
+    time and a list of words are left out, and fetched again.
+    """
+    from doge import cache  # noqa: PLC0415
+
+    cached = cache.read_json(name)
+    if not isinstance(cached, dict):
+        return {}
+    return {
+        source: entry
+        for source, entry in cached.items()
+        if isinstance(entry, list)
+        and len(entry) == 2  # noqa: PLR2004
+        and isinstance(entry[0], (int, float))
+        and isinstance(entry[1], list)
+        and all(isinstance(word, str) for word in entry[1])
+    }
+
+
+def __getattr__(name):
+    # ROOT used to be a module constant, keep it working without paying for
+    # importlib.resources on every start.
+    if name == "ROOT":
+        from importlib.resources import files  # noqa: PLC0415
+
+        return files("doge").joinpath("static")
+    msg = f"module {__name__!r} has no attribute {name!r}"
+    raise AttributeError(msg)
+
+
+rx_ansi = re.compile(r"\x1b\[[0-9;]*m")
+
+
 def clean_len(s):
     """Calculate the length of a string without its color codes."""
-    s = re.sub(r"\x1b\[[0-9;]*m", "", s)
+    if "\x1b" not in s:
+        return len(s)
 
-    return len(s)
+    return len(rx_ansi.sub("", s))
 
 
 def onscreen_len(s):
     """Calculate the length of a unicode string on screen.
 
-    Also account for double-width characters.
+    Also account for double-width and zero-width characters.
+    """
+    if s.isascii():
+        return len(s)
+
+    return unicode_len(s)
+
+
+@functools.lru_cache(maxsize=1024)
+def unicode_len(s):
+    """Calculate the onscreen length of a non-ASCII string.
+
+    Words tend to come back again and again, so remember the recent ones.
+    """
+    return sum(map(char_width, s))
+
+
+@functools.cache
+def char_width(ch):
+    """Return how many columns a character takes up on screen.
+
+    Every character is only looked up in the unicode database once.
     """
-    length = 0
-    for ch in s:
-        length += 2 if unicodedata.east_asian_width(ch) == "W" else 1
+    import unicodedata  # noqa: PLC0415
 
-    return length
+    if unicodedata.combining(ch) or unicodedata.category(ch) in {"Mn", "Me", "Cf"}:
+        # Accents and other marks go on top of the previous character, and
+        # formatting characters like zero width spaces are not shown at all.
+        return 0
+    return 2 if unicodedata.east_asian_width(ch) in {"W", "F"} else 1
 
 
 def setup_arguments():
@@ -373,7 +937,7 @@ def setup_arguments():
         "--shibe",
         help="wow shibe file",
         dest="doge_path",
-        choices=[file.name for file in ROOT.iterdir()],
+        choices=atlas.shibe_names(),
     )
 
     parser.add_argument("--no-shibe", action="store_true", help="wow no doge show :(")
@@ -384,9 +948,24 @@ def setup_arguments():
         choices=[*sorted(wow.SEASONS.keys()), "none"],
     )
 
-    parser.add_argument(
+    sampling = parser.add_mutually_exclusive_group()
+    sampling.add_argument(
         "-f", "--frequency", help="such frequency based", action="store_true"
     )
+    sampling.add_argument(
+        "-w",
+        "--weighted",
+        help="very weighted, words show up as often as they are seen",
+        action="store_true",
+    )
+
+    parser.add_argument(
+        "--exponent",
+        help="much sharp, raise --weighted counts to this power, "
+        "below 1 flattens, default is 1",
+        type=float,
+        default=1.0,
+    )
 
     parser.add_argument(
         "--step",
@@ -396,6 +975,13 @@ def setup_arguments():
         default=2,
     )
 
+    parser.add_argument(
+        "--input",
+        help="such files, read words from these instead of stdin",
+        nargs="+",
+        metavar="FILE",
+    )
+
     parser.add_argument(
         "--min_length",
         help="pretty minimum",  # minimum length of a word
@@ -428,32 +1014,273 @@ def setup_arguments():
         type=float,
         default=30,
     )
+
+    parser.add_argument(
+        "--pack",
+        help="much room, pack many words per line, also left of Shibe, with "
+        "--density as percent of free cells instead of lines",
+        action="store_true",
+    )
+
+    parser.add_argument(
+        "--watch",
+        help="such animation, keep doge going until ctrl-c",
+        action="store_true",
+    )
+
+    parser.add_argument(
+        "--fps",
+        help="many frames per second for --watch, default is 1",
+        type=float,
+        default=1,
+    )
+
+    parser.add_argument(
+        "-n",
+        "--count",
+        help="many frames, each with new words, default is 1",
+        type=int,
+        default=1,
+    )
+
+    parser.add_argument(
+        "--delimiter",
+        help="such frame separator for --count, default is a line with %%",
+        default="%\n",
+    )
+
+    parser.add_argument(
+        "--ndjson",
+        help="very machine, print --count frames as JSON lines",
+        action="store_true",
+    )
+
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        help="much processes for counting --input words with -f or -w, and for "
+        "rendering --count frames, default is 1",
+        type=int,
+        default=1,
+    )
+
+    parser.add_argument(
+        "--seed",
+        help="such reproducible, same seed and words make same doge",
+        type=int,
+    )
+
+    parser.add_argument(
+        "--date",
+        help="wow time travel, celebrate the season of a YYYY-MM-DD date",
+        type=parse_date,
+    )
+
+    parser.add_argument(
+        "--budget-ms",
+        help="very hurry, give system data at most this many ms, default is 200",
+        type=float,
+        default=200,
+    )
+
+    parser.add_argument(
+        "--timings",
+        help="such stopwatch, report how long every phase took to stderr, or "
+        "append it to a file, also set by $DOGE_TIMINGS (a file, or - or 1 for "
+        "stderr)",
+        nargs="?",
+        const="-",
+        metavar="FILE",
+    )
+
+    parser.add_argument(
+        "--refresh",
+        help="very fresh, ignore cached system data",
+        action="store_true",
+    )
+
+    parser.add_argument(
+        "--serve",
+        help="such daemon, keep warm for doge-client",
+        action="store_true",
+    )
     return parser
 
 
+def parse_date(value):
+    """Parse a --date."""
+    import datetime as dt  # noqa: PLC0415
+
+    try:
+        return dt.date.fromisoformat(value)
+    except ValueError:
+        msg = f"wow, such bad date {value!r}, use YYYY-MM-DD"
+        raise argparse.ArgumentTypeError(msg) from None
+
+
+# Frames rendered per task when spreading --count over --jobs processes.
+BATCH_SIZE = 100
+
+_batch_doge = None
+
+
+def init_batch_worker(doge):
+    """Keep the doge that a batch worker process renders frames with."""
+    global _batch_doge  # noqa: PLW0603
+    _batch_doge = doge
+
+
+def render_batch(batch):
+    """Render a (seed, count) batch of frames in a batch worker process."""
+    return _batch_doge.render_batch(batch)
+
+
+def count_shard(shard):
+    """Count the words in a shard of an --input file, in a worker process.
+
+    A shard is (path, start, end, filter_stopwords, min_length), and only the
+    words starting between the start and end bytes of the file are counted.
+    """
+    import collections  # noqa: PLC0415
+
+    path, start, end, filter_stopwords, min_length = shard
+    counts = collections.Counter()
+    for words in corpus.iter_file_word_chunks(path, start, end):
+        counts.update(
+            Doge.filter_words(words, wow.STOPWORDS, min_length)
+            if filter_stopwords
+            else words
+        )
+    return counts
+
+
+def render(  # noqa: PLR0913
+    width,
+    height,
+    *,
+    words=None,
+    shibe=None,
+    season=None,
+    density=30,
+    rng=None,
+    pretty=True,
+    pack=False,
+):
+    """Return a frame of doge as a string.
+
+    This is for embedding doge. Unlike the CLI, it does not look at stdin, the
+    environment, the system or the clock, does not write anywhere, and only
+    uses randomness from rng (a random.Random), so frames can be rendered
+    side by side in the same process.
+
+    words replaces the default words, shibe is a Shibe file name like --shibe,
+    and season is a season from wow.SEASONS whose Shibe and words are used.
+    Any other shibe or season raises ValueError.
+    Without pretty, there is no Shibe and no color, as when piping the CLI.
+    With pack, messages are packed like with --pack.
+    """
+    if not 0 <= density <= Doge.MAX_PERCENT:
+        msg = f"wow, density such {density}, must be between 0 and 100"
+        raise ValueError(msg)
+    # Only Shibes that come with doge, never any other file.
+    if shibe is not None and shibe not in atlas.shibe_names():
+        msg = f"wow, such unknown shibe {shibe!r}"
+        raise ValueError(msg)
+    if season and season not in [*wow.SEASONS, "none"]:
+        msg = f"wow, such unknown season {season!r}"
+        raise ValueError(msg)
+
+    tty = TTYHandler()
+    tty.width = width
+    tty.height = height
+    tty.out_is_tty = tty.pretty = pretty
+    tty.prompt_height = 0
+
+    ns = argparse.Namespace(**vars(default_arguments()))
+    ns.doge_path = shibe
+    ns.season = season or "none"
+    ns.density = density
+    ns.pack = pack
+
+    doge = Doge(tty, ns, rng=rng)
+    doge.setup_seasonal()
+    if words is not None:
+        doge.words.clear()
+        doge.words.extend(words)
+    if pretty:
+        doge.doge, doge.doge_lens = doge.load_doge()
+    if not doge.setup_lines():
+        msg = f"wow, such small terminal, no doge under {doge.min_width()} column"
+        raise ValueError(msg)
+
+    doge.apply_text()
+    return "".join(doge.frame)
+
+
+def timings_target(value):
+    """Return where $DOGE_TIMINGS wants timings, "-" for stderr, or None.
+
+    Flag like values are not taken for file names, so that DOGE_TIMINGS=1
+    does not leave files named 1 wherever logins start.
+    """
+    if value is None or value.lower() in {"0", "no", "false", "off"}:
+        return None
+    if value.lower() in {"", "-", "1", "yes", "true", "on"}:
+        return "-"
+    return value
+
+
+def apply_max_size(tty, ns):
+    """Shrink the terminal to the max height and width asked for."""
+    if ns.max_height:
+        tty.height = ns.max_height
+    if ns.max_width:
+        tty.width = ns.max_width
+
+
+@functools.cache
+def default_arguments():
+    """Return the arguments doge gets when given none."""
+    return setup_arguments().parse_args([])
+
+
 def main():
     """Run the main CLI script."""
+    started = time.perf_counter()
     tty = TTYHandler()
     tty.setup()
 
     parser = setup_arguments()
     ns = parser.parse_args()
-    if ns.max_height:
-        tty.height = ns.max_height
-    if ns.max_width:
-        tty.width = ns.max_width
+    if ns.serve:
+        from doge import daemon  # noqa: PLC0415
+
+        return daemon.serve()
+
+    apply_max_size(tty, ns)
+
+    timings = None
+    if target := ns.timings or timings_target(os.getenv("DOGE_TIMINGS")):
+        timings = phases.add_hook(phases.Timings(started))
 
     try:
         shibe = Doge(tty, ns)
         if not shibe.setup():
             # We assume that setup() prints what went wrong.
             return 1
-        shibe.print_doge()
+        if ns.watch:
+            shibe.watch()
+        elif ns.count != 1 or ns.ndjson:
+            shibe.print_frames()
+        else:
+            shibe.print_doge()
 
     except (UnicodeEncodeError, UnicodeDecodeError):
         # Some kind of unicode error happened. This is usually because the
         # users system does not have a proper locale set up. Try to be helpful
         # and figure out what could have gone wrong.
+        import traceback  # noqa: PLC0415
+
         traceback.print_exc()
         print()
 
@@ -475,6 +1302,10 @@ def main():
             "/usr/bin/locale"
         )
         return 1
+    finally:
+        if timings:
+            phases.remove_hook(timings)
+            timings.report(target)
     return 0
 
 
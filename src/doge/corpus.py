@@ -0,0 +1,153 @@
+"""Turn piles of text into much words.
+
+Sources can be arbitrarily large (think `journalctl | doge`), so nothing in
+here holds more than one chunk of input or one sample of words in memory.
+
+Files are memory mapped and tokenised a big chunk at a time. Chunks of
+plain ASCII, which is most of any log, skip decoding and regexes altogether.
+Big files can also be split into byte range shards, to be counted by many
+processes at once.
+"""
+
+# Copyright (C) 2013-2024 Olivia Thiderman
+
+import io
+import itertools
+import math
+import os
+import random
+import re
+
+CHUNK_SIZE = 1 << 16
+FILE_CHUNK_SIZE = 1 << 24
+# Files are not split into shards smaller than this, as every shard comes with
+# the cost of sending its counts back.
+MIN_SHARD_SIZE = 1 << 22
+
+rx_word = re.compile(r"\w+")
+# Bytes that might be part of a word: ASCII word characters, and anything that
+# is not ASCII, which is sorted out after decoding.
+rx_word_bytes = re.compile(rb"[\w\x80-\xff]+")
+rx_gap = re.compile(rb"[^\w\x80-\xff]")
+
+# Lowercases ASCII word characters, and turns every other byte into a space.
+ASCII_WORDS = (
+    bytes(
+        ord(chr(byte).lower()) if re.match(rb"\w", bytes([byte])) else ord(" ")
+        for byte in range(128)
+    )
+    + b" " * 128
+)
+
+
+def iter_word_chunks(stream, chunk_size=CHUNK_SIZE):
+    """Yield lists of lowercased words read from a text stream.
+
+    The stream is read chunk_size characters at a time. A word touching the end
+    of a chunk might continue in the next one, so it is held back and glued to
+    the start of the following chunk.
+    """
+    tail = ""
+    while chunk := stream.read(chunk_size):
+        chunk = tail + chunk.lower()
+        words = rx_word.findall(chunk)
+        tail = words.pop() if words and rx_word.match(chunk, len(chunk) - 1) else ""
+        yield words
+    if tail:
+        yield [tail]
+
+
+def word_end(data, pos):
+    """Return pos, or the end of the word that pos is in the middle of."""
+    if 0 < pos < len(data) and rx_word_bytes.match(data, pos - 1, pos):
+        match = rx_gap.search(data, pos)
+        return match.start() if match else len(data)
+    return pos
+
+
+def iter_buffer_word_chunks(data, start=0, end=None, chunk_size=FILE_CHUNK_SIZE):
+    """Yield lists of lowercased words from the bytes of data[start:end].
+
+    data can be anything bytes like, such as a memory map, and is only ever
+    copied a chunk at a time. Words belong to the range they start in, so a
+    word crossing end is read to its end, and one crossing start is left to
+    the range before. Chunks always end between words, so that no word and
+    no UTF-8 character is ever split. Invalid UTF-8 splits words, like any
+    other character that is not a word character.
+    """
+    end = len(data) if end is None else min(end, len(data))
+    start = word_end(data, start)
+    while start < end:
+        stop = word_end(data, min(start + chunk_size, end))
+        chunk = data[start:stop]
+        if chunk.isascii():
+            # Same words as the regex finds, a couple of times faster.
+            yield chunk.translate(ASCII_WORDS).decode("ascii").split()
+        else:
+            yield rx_word.findall(chunk.decode("utf-8", "replace").lower())
+        start = stop
+
+
+def iter_file_word_chunks(path, start=0, end=None, chunk_size=FILE_CHUNK_SIZE):
+    """Yield lists of lowercased words from a file, memory mapped if it can be.
+
+    Only the words starting in the byte range from start to end are read, see
+    iter_buffer_word_chunks(). Files that cannot be mapped are read whole.
+    """
+    import mmap  # noqa: PLC0415
+
+    with open(path, "rb") as f:  # noqa: PTH123
+        try:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            # Empty, or not a regular file, such as a pipe. Read it as it comes.
+            stream = io.TextIOWrapper(f, encoding="utf-8", errors="replace")
+            yield from iter_word_chunks(stream)
+            return
+        with data:
+            yield from iter_buffer_word_chunks(data, start, end, chunk_size)
+
+
+def file_shards(path, count, min_size=MIN_SHARD_SIZE):
+    """Return up to count (start, end) byte ranges that split a file evenly.
+
+    No range is smaller than min_size, except when the whole file is. Files
+    that are not regular files, such as pipes, come as one (0, None) range.
+    """
+    import stat  # noqa: PLC0415
+
+    status = os.stat(path)  # noqa: PTH116
+    if not stat.S_ISREG(status.st_mode):
+        return [(0, None)]
+    size = status.st_size
+    count = max(1, min(count, size // min_size))
+    bounds = [size * i // count for i in range(count + 1)]
+    return list(zip(bounds, bounds[1:]))
+
+
+def iter_words(stream, chunk_size=CHUNK_SIZE):
+    """Yield lowercased words read from a text stream."""
+    return itertools.chain.from_iterable(iter_word_chunks(stream, chunk_size))
+
+
+def reservoir_sample(iterable, k, rng=random):
+    """Return k items sampled uniformly from an iterable of unknown length.
+
+    This is Li's "Algorithm L": instead of rolling the dice for every item, it
+    calculates how many items to skip before the next replacement, so the
+    iterable is consumed at C speed and only k items are ever kept around.
+    """
+    it = iter(iterable)
+    sample = list(itertools.islice(it, k))
+    if len(sample) < k or k < 1:
+        return sample
+
+    w = math.exp(math.log(rng.random() or 0.5) / k)
+    while True:
+        skip = math.floor(math.log(rng.random() or 0.5) / math.log(1 - w))
+        for item in itertools.islice(it, skip, skip + 1):
+            sample[rng.randrange(k)] = item
+            break
+        else:
+            return sample
+        w *= math.exp(math.log(rng.random() or 0.5) / k)
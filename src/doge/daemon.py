@@ -0,0 +1,128 @@
+"""Keep a warm doge around, so that logins get Shibe instantly.
+
+`doge --serve` listens on a Unix socket in the runtime dir of the user, and
+renders frames for doge-client. Everything that is slow to get, such as the
+imports and the system data, is done once; the system data is then refreshed
+in the background every now and then.
+"""
+
+# Copyright (C) 2013-2024 Olivia Thiderman
+
+import contextlib
+import io
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+from pathlib import Path
+
+from doge import core
+from doge.client import socket_path
+
+REFRESH_INTERVAL = 60
+
+
+class DaemonDoge(core.Doge):
+    """A doge that uses the system data gathered by the daemon."""
+
+    def __init__(self, tty, ns, real_data):
+        super().__init__(tty, ns)
+        self.real_data = real_data
+
+    def get_real_data(self):
+        """Grab the data the daemon gathered from the system."""
+        self.words.extend(self.real_data)
+
+
+class DogeServer(socketserver.UnixStreamServer):
+    """Serve rendered frames, one client at a time."""
+
+    def __init__(self, path):
+        super().__init__(path, DogeRequestHandler)
+        self.parser = core.setup_arguments()
+        self.gatherer = core.Doge(core.TTYHandler(), self.parser.parse_args([]))
+        self.real_data = self.gatherer.gather_real_data()
+        self.stopped = threading.Event()
+
+    def refresh(self):
+        """Gather new system data every REFRESH_INTERVAL seconds."""
+        while not self.stopped.wait(REFRESH_INTERVAL):
+            self.real_data = self.gatherer.gather_real_data()
+
+    def render(self, request):
+        """Return a rendered frame for a request, or None if it can't be done.
+
+        Anything that would make doge complain, such as bad arguments or a too
+        small terminal, is left for the client to find out in-process.
+        """
+        tty = core.TTYHandler()
+        tty.width = request["width"]
+        tty.height = request["height"]
+        tty.out_is_tty = tty.pretty = request["pretty"]
+        tty.prompt_height = request["prompt_height"]
+
+        quiet = io.StringIO()
+        with contextlib.redirect_stdout(quiet), contextlib.redirect_stderr(quiet):
+            try:
+                ns = self.parser.parse_args(request["args"])
+                if ns.serve or ns.watch or ns.count != 1 or ns.ndjson or ns.input:
+                    # Only single frames are served, and files are read where
+                    # the client is.
+                    return None
+                core.apply_max_size(tty, ns)
+                shibe = DaemonDoge(tty, ns, self.real_data)
+                if not shibe.setup():
+                    return None
+            except SystemExit:
+                return None
+        return "".join(shibe.frame)
+
+
+class DogeRequestHandler(socketserver.StreamRequestHandler):
+    """Read one JSON request line and answer with a frame."""
+
+    def handle(self):
+        """Render the requested frame and send it back."""
+        try:
+            request = json.loads(self.rfile.readline())
+        except ValueError:
+            return
+        frame = self.server.render(request)
+        if frame:
+            self.wfile.write(frame.encode())
+
+
+def serve():
+    """Run the doge daemon until interrupted."""
+    path = Path(socket_path())
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    # Leftover sockets from daemons that died are fine to replace, running
+    # daemons are not.
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(str(path))
+        except OSError:
+            path.unlink(missing_ok=True)
+        else:
+            sys.stderr.write(f"wow, such daemon already at {path}\n")
+            return 1
+
+    old_umask = os.umask(0o077)
+    try:
+        server = DogeServer(str(path))
+    finally:
+        os.umask(old_umask)
+
+    threading.Thread(target=server.refresh, daemon=True).start()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stopped.set()
+        server.server_close()
+        path.unlink(missing_ok=True)
+    return 0
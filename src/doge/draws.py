@@ -0,0 +1,81 @@
+"""Draw all the random numbers for a frame in batches.
+
+Laying out a frame takes a handful of random numbers per message. Drawing
+them a batch at a time, with a single random float per number instead of
+randrange(), keeps a wallpaper sized canvas with tens of thousands of
+messages fast. When NumPy is installed, canvases of NUMPY_ROWS rows or more
+draw with it instead, which is faster still, once importing NumPy has been
+paid for.
+
+Draws come from the random.Random of the doge, so the same seed still gives
+the same frame. NumPy draws differently, so a big canvas only looks the same
+again with the same seed and the same NumPy availability.
+"""
+
+# Copyright (C) 2013-2024 Olivia Thiderman
+
+NUMPY_ROWS = 10_000
+
+
+class Draws:
+    """Draw batches of random numbers from a random.Random."""
+
+    def __init__(self, rng):
+        self.random = rng.random
+
+    def rows(self, rows, count):
+        """Return count different row indexes below rows, in order."""
+        # Floyd's algorithm, one float per row picked.
+        random = self.random
+        picked = set()
+        for top in range(rows - count, rows):
+            row = int(random() * (top + 1))
+            picked.add(top if row in picked else row)
+        return sorted(picked)
+
+    def below(self, bound, count):
+        """Return count numbers from 0 up to, but not including, bound."""
+        random = self.random
+        return [int(random() * bound) for _ in range(count)]
+
+    def spacers(self, intervals):
+        """Return a number below every interval, or 0 for those under 1."""
+        random = self.random
+        return [
+            int(random() * interval) if interval > 0 else 0 for interval in intervals
+        ]
+
+
+class NumpyDraws:
+    """Draw batches of random numbers with NumPy, seeded from a random.Random."""
+
+    def __init__(self, rng, numpy):
+        self.np = numpy
+        self.generator = numpy.random.default_rng(rng.getrandbits(64))
+
+    def rows(self, rows, count):
+        """Return count different row indexes below rows, in order."""
+        picked = self.generator.choice(rows, size=count, replace=False)
+        return self.np.sort(picked).tolist()
+
+    def below(self, bound, count):
+        """Return count numbers from 0 up to, but not including, bound."""
+        return self.generator.integers(bound, size=count).tolist()
+
+    def spacers(self, intervals):
+        """Return a number below every interval, or 0 for those under 1."""
+        intervals = self.np.maximum(self.np.asarray(intervals, dtype=float), 0)
+        picked = self.generator.random(len(intervals)) * intervals
+        return picked.astype(self.np.int64).tolist()
+
+
+def draws_for(rng, rows):
+    """Return the fastest Draws for a canvas with that many rows."""
+    if rows >= NUMPY_ROWS:
+        try:
+            import numpy as np  # noqa: PLC0415
+        except ImportError:
+            pass
+        else:
+            return NumpyDraws(rng, np)
+    return Draws(rng)
@@ -0,0 +1,118 @@
+"""Let callers watch doge work, one phase at a time.
+
+Every phase of getting Shibe on screen, such as picking the season, asking
+ps for processes or applying the text, runs inside phase(name). Hooks added
+with add_hook() are called with the name of every phase as it starts, and
+return a context manager that is exited when it ends. To profile every phase
+on its own:
+
+    import cProfile, contextlib
+    from doge import phases
+
+    @contextlib.contextmanager
+    def profile(name):
+        with cProfile.Profile() as profiler:
+            yield
+        profiler.dump_stats(f"doge-{name}.prof")
+
+    phases.add_hook(profile)
+
+Phases never nest within a thread. Without hooks, phases cost next to
+nothing.
+"""
+
+# Copyright (C) 2013-2024 Olivia Thiderman
+
+import contextlib
+import functools
+import sys
+import time
+
+_hooks = []
+
+
+def add_hook(hook):
+    """Call hook(name) around every phase, and return it."""
+    _hooks.append(hook)
+    return hook
+
+
+def remove_hook(hook):
+    """Stop calling a hook added with add_hook()."""
+    _hooks.remove(hook)
+
+
+@contextlib.contextmanager
+def phase(name):
+    """Run the hooks around a phase."""
+    with contextlib.ExitStack() as stack:
+        for hook in _hooks:
+            stack.enter_context(hook(name))
+        yield
+
+
+def timed(name):
+    """Make the decorated function a phase."""
+
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _hooks:
+                return func(*args, **kwargs)
+            with phase(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+class Timings:
+    """A hook that keeps how much wall time every phase took."""
+
+    def __init__(self, started=None):
+        self.started = started or time.perf_counter()
+        # {name: [calls, seconds]}, so that phases run for every frame don't
+        # keep piling up.
+        self.phases = {}
+
+    @contextlib.contextmanager
+    def __call__(self, name):
+        """Time a phase."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            timing = self.phases.setdefault(name, [0, 0.0])
+            timing[0] += 1
+            timing[1] += time.perf_counter() - started
+
+    def report(self, target):
+        """Write the timings to stderr if target is "-", else append to it.
+
+        Files get one JSON object per run, so that the timings of every login
+        can be collected in one place.
+        """
+        total = time.perf_counter() - self.started
+        if target == "-":
+            lines = [f"wow timings, {total * 1e3:.2f} ms total\n"]
+            for name, (calls, seconds) in self.phases.items():
+                times = f" ({calls} times)" if calls > 1 else ""
+                lines.append(f"  {name:<16}{seconds * 1e3:>9.2f} ms{times}\n")
+            sys.stderr.write("".join(lines))
+            return
+
+        import datetime as dt  # noqa: PLC0415
+        import json  # noqa: PLC0415
+
+        run = {
+            "date": dt.datetime.now(dt.timezone.utc).isoformat(timespec="seconds"),
+            "argv": sys.argv[1:],
+            "total_ms": round(total * 1e3, 3),
+            "phases": {
+                name: round(seconds * 1e3, 3)
+                for name, (_, seconds) in self.phases.items()
+            },
+        }
+        with contextlib.suppress(OSError), open(target, "a", encoding="utf-8") as f:  # noqa: PTH123
+            f.write(json.dumps(run) + "\n")
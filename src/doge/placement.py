@@ -0,0 +1,175 @@
+"""Pack several messages onto every line, wherever there is room, wow.
+
+With --pack, messages are not just put one per line to the right of Shibe.
+Every line keeps track of its free columns as spans, which are the blank
+space left of Shibe and everything right of him, and messages are placed at
+random free columns of random lines until --density percent of all the free
+cells are taken, or there is no room left.
+"""
+
+# Copyright (C) 2013-2024 Olivia Thiderman
+
+import bisect
+import math
+import re
+
+from doge import core
+
+# Give up after this many messages in a row found no room.
+MAX_MISSES = 64
+# The fewest cells a message takes: "wow", and a free column next to it.
+MIN_MESSAGE_CELLS = 4
+
+# Leading blanks of a Shibe line: spaces, and escapes that only reset colors.
+rx_blank = re.compile(r"(?:\x1b\[(?:0|39|49)?m| )*")
+
+
+class FreeSpans:
+    """The free columns of a line, as sorted and disjoint [start, end) spans.
+
+    Messages keep a free column between them and anything else on the line,
+    except at the edges of the line, which end at column edge.
+
+    A line has only a handful of spans, as every message takes at least
+    MIN_MESSAGE_CELLS of them, so they are kept in plain sorted lists. take()
+    finds its span with bisect, and room() looks at every span, since every
+    column that fits has to be counted anyway to pick one of them uniformly.
+    """
+
+    def __init__(self, spans, edge):
+        self.starts = [start for start, _ in spans]
+        self.ends = [end for _, end in spans]
+        self.edge = edge
+
+    def room(self, width):
+        """Return (first, last) columns a message of width could start at."""
+        rooms = []
+        for start, end in zip(self.starts, self.ends):
+            first = start + 1 if start > 0 else start
+            last = end - width - 1 if end < self.edge else end - width
+            if first <= last:
+                rooms.append((first, last))
+        return rooms
+
+    def take(self, column, width):
+        """Mark width columns from column as taken."""
+        i = bisect.bisect_right(self.starts, column) - 1
+        start, end = self.starts[i], self.ends[i]
+        del self.starts[i], self.ends[i]
+        if column + width < end:
+            self.starts.insert(i, column + width)
+            self.ends.insert(i, end)
+        if start < column:
+            self.starts.insert(i, start)
+            self.ends.insert(i, column)
+
+    def __len__(self):
+        """Return the number of free columns."""
+        return sum(self.ends) - sum(self.starts)
+
+
+class Line:
+    """A line of the canvas: the body on it, and where it is still free.
+
+    The body is whatever is on the line, such as a slice of Shibe, without
+    its leading blanks. Escapes in those blanks are kept in escapes, and the
+    body starts at column lead.
+    """
+
+    def __init__(self, line, line_len, edge):
+        body = line.removesuffix("\n")
+        body_end = line_len - 1 if line.endswith("\n") else line_len
+        blank = rx_blank.match(body).group()
+        self.escapes = blank.replace(" ", "")
+        self.body = body[len(blank) :]
+        self.lead = blank.count(" ")
+        if not self.body:
+            self.spans = FreeSpans([(0, edge)], edge)
+            return
+
+        spans = [(0, self.lead)] if self.lead else []
+        if body_end < edge:
+            spans.append((body_end, edge))
+        self.spans = FreeSpans(spans, edge)
+        self.body_end = body_end
+
+    def render(self, message, messages):
+        """Return the line with (column, text, length, color) messages on it."""
+        spaces = message.spaces
+        parts = [self.escapes]
+        column = 0
+        body = self.body
+        for start, text, text_len, color in sorted(messages):
+            if body and self.lead < start:
+                parts += [spaces[: self.lead - column], body]
+                column = self.body_end
+                body = None
+            parts.append(spaces[: start - column])
+            if color is None:
+                parts.append(text)
+            else:
+                parts += [core.COLOR_CODES[color], text, message.RESET]
+            column = start + text_len
+        if body:
+            parts += [spaces[: self.lead - column], body]
+        parts.append("\n")
+        return "".join(parts)
+
+
+def canvas(doge):
+    """Return the Lines of doge, and how many of their cells to fill."""
+    # Keep off the last column, so that no line wraps.
+    edge = doge.tty.width - 1
+    rows = [
+        Line(line, line_len, edge) for line, line_len in zip(doge.lines, doge.line_lens)
+    ]
+    free = sum(len(row.spans) for row in rows)
+    return rows, free * doge.ns.density / 100
+
+
+def message_count(doge):
+    """Return the most messages that pack() could put on a frame of doge."""
+    _, target = canvas(doge)
+    return math.ceil(target / MIN_MESSAGE_CELLS)
+
+
+def pack(doge):
+    """Return the lines of doge, packed with messages."""
+    rng = doge.rng
+    rows, target = canvas(doge)
+
+    message = core.DogeMessage(doge)
+    placed = {}
+    taken = 0
+    misses = 0
+    while taken < target and misses < MAX_MISSES:
+        word = doge.words.get()
+        if rng.randrange(20) == 0:
+            word = "wow"
+        text = message.text(word)
+        text_len = core.onscreen_len(text)
+
+        row = rng.randrange(len(rows))
+        rooms = rows[row].spans.room(text_len)
+        if not rooms:
+            misses += 1
+            continue
+        misses = 0
+
+        # Every free column that fits is as likely as any other.
+        pick = rng.randrange(sum(last - first + 1 for first, last in rooms))
+        for first, last in rooms:
+            if pick <= last - first:
+                column = first + pick
+                break
+            pick -= last - first + 1
+
+        rows[row].spans.take(column, text_len)
+        color = doge.colors.get() if doge.tty.pretty else None
+        placed.setdefault(row, []).append((column, text, text_len, color))
+        taken += text_len
+
+    frame = doge.lines.copy()
+    for row, messages in placed.items():
+        frame[row] = rows[row].render(message, messages)
+    return frame
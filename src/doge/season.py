@@ -0,0 +1,147 @@
+"""Figure out which season Shibe is celebrating today.
+
+The dates in wow.SEASONS are resolved once per year into a day-of-year interval
+index, which is kept in the user cache dir. That way the astronomical and
+ecclesiastical calculations only run on the first doge of the year, and every
+other run answers "which season is today" with a single bisect.
+"""
+
+# Copyright (C) 2013-2024 Olivia Thiderman
+
+import bisect
+import datetime as dt
+
+from doge import cache, wow
+
+CACHE_NAME = "seasons.json"
+
+
+class SeasonCalendar:
+    """Sorted, non-overlapping (start, end, season) day-of-year intervals.
+
+    Days are zero-based and ends are exclusive, so a season with the dates
+    ((12, 14), (12, 26)) is celebrated from December 14 up until, but not on,
+    December 26.
+    """
+
+    def __init__(self, year, intervals):
+        self.year = year
+        self.intervals = [tuple(interval) for interval in intervals]
+        self.starts = [start for start, _, _ in self.intervals]
+
+    @classmethod
+    def load(cls, year):
+        """Return the calendar for a year, from the cache if possible."""
+        signature = season_signature()
+        data = cache.read_json(CACHE_NAME)
+        if (
+            isinstance(data, dict)
+            and data.get("year") == year
+            and data.get("signature") == signature
+            and valid_intervals(data.get("intervals"))
+        ):
+            return cls(year, data["intervals"])
+
+        season_calendar = cls.build(year)
+        cache.write_json(
+            CACHE_NAME,
+            {
+                "year": year,
+                "signature": signature,
+                "intervals": season_calendar.intervals,
+            },
+        )
+        return season_calendar
+
+    @classmethod
+    def build(cls, year):
+        """Resolve the dates of every season in a year into an index.
+
+        If there are two or more holidays defined for a certain date, the first
+        one in wow.SEASONS takes precedence.
+        """
+        days = [None] * days_in_year(year)
+        for season, data in wow.SEASONS.items():
+            dates = data["dates"]
+            for start, end in dates(year) if callable(dates) else (dates,):
+                for day in season_days(year, start, end):
+                    if days[day] is None:
+                        days[day] = season
+
+        # Collapse the per-day table into runs of the same season.
+        intervals = []
+        for day, season in enumerate(days):
+            if season is None:
+                continue
+            if intervals and intervals[-1][1] == day and intervals[-1][2] == season:
+                intervals[-1][1] = day + 1
+            else:
+                intervals.append([day, day + 1, season])
+        return cls(year, intervals)
+
+    def lookup(self, date):
+        """Return the season celebrated on date, or None."""
+        day = date.timetuple().tm_yday - 1
+        i = bisect.bisect_right(self.starts, day) - 1
+        if i >= 0:
+            start, end, season = self.intervals[i]
+            if start <= day < end:
+                return season
+        return None
+
+
+def valid_intervals(intervals):
+    """Return whether cached intervals are sorted (start, end, season) lists.
+
+    The cache file may have been mangled by anything, and a calendar that can
+    not be read is simply built again.
+    """
+    if not isinstance(intervals, list):
+        return False
+    previous_end = 0
+    for interval in intervals:
+        if not (
+            isinstance(interval, list)
+            and len(interval) == 3  # noqa: PLR2004
+            and all(isinstance(day, int) for day in interval[:2])
+            and previous_end <= interval[0] < interval[1]
+            and isinstance(interval[2], str)
+            and interval[2] in wow.SEASONS
+        ):
+            return False
+        previous_end = interval[1]
+    return True
+
+
+def season_days(year, start, end):
+    """Return the zero-based days of the year between two (month, day) dates.
+
+    Be sane if the holiday season spans over New Year's day, and wrap around
+    to the beginning of the same year.
+    """
+    first = dt.date(year, *start).timetuple().tm_yday - 1
+    last = dt.date(year, *end).timetuple().tm_yday - 1
+    if start[0] > end[0]:
+        return [*range(first, days_in_year(year)), *range(last)]
+    return range(first, last)
+
+
+def days_in_year(year):
+    """Return the number of days in a year."""
+    return dt.date(year, 12, 31).timetuple().tm_yday
+
+
+def season_signature():
+    """Describe wow.SEASONS, so that cached calendars notice when it changes."""
+    return repr(
+        [
+            (season, getattr(data["dates"], "__name__", data["dates"]))
+            for season, data in wow.SEASONS.items()
+        ]
+    )
+
+
+def current_season(today=None):
+    """Return the season celebrated today, or None."""
+    today = today or dt.date.today()  # noqa: DTZ011
+    return SeasonCalendar.load(today.year).lookup(today)
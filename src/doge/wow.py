@@ -6,78 +6,106 @@ Please extend this file with more lvl=100 shibe wow.
 # Copyright (C) 2013-2024 Olivia Thiderman
 
 import datetime as dt
+import itertools
 import random
-from collections import deque
+from collections import Counter, deque
 
-import dateutil.easter
-import dateutil.tz
-import fullmoon
 
-
-class DogeDeque(deque):
+class DogeDeque(list):
     """A doge deque. A doqe, if you may.
 
     Because random is random, just using a random choice from the static lists
     below there will always be some repetition in the output. This collection
-    will instead shuffle the list upon init, and act as a rotating deque
-    whenever an item is gotten from it.
+    will instead act as a shuffle bag: every item is gotten once, in random
+    order, before any item is gotten again.
+
+    The shuffling is a lazy Fisher-Yates over the backing list. Items before
+    doge_index have been gotten in the current round, items after it have not,
+    and each get() swaps a random unvisited item into place. Extending appends
+    to the unvisited end, so getting and extending are O(1) no matter how many
+    items there are.
     """
 
-    def __init__(self, *args, **_kwargs):
+    def __init__(self, *args, **kwargs):
         self.doge_index = 0
-        args = list(args)
-        random.shuffle(args)
+        self.rng = kwargs.get("rng") or random
         super().__init__(args)
 
     def get(self):
         """Get one item and prepare the next.
 
-        This will rotate the deque one step. Repeated gets will
-        return different items.
+        Repeated gets will return different items until all of them have been
+        gotten, after which a new round starts.
         """
-        self.doge_index += 1
-
-        # If we've gone through the entire deque once, shuffle it again to
-        # simulate ever-flowing random. self.shuffle() will run __init__(),
-        # which will reset the index to 0.
-        if self.doge_index == len(self):
-            self.shuffle()
-
-        self.rotate(1)
-        try:
-            return self[0]
-        except IndexError:
+        if not self:
             return "wow"
 
-    def extend(self, iterable):
-        """Extend and shuffle."""
-        # Whenever we extend the list, make sure to shuffle in the new items!
-        super().extend(iterable)
-        self.shuffle()
+        # If we've gone through the entire deque once, start over to simulate
+        # ever-flowing random.
+        if self.doge_index >= len(self):
+            self.doge_index = 0
 
-    def shuffle(self):
-        """Shuffle the deque.
+        i = self.doge_index
+        j = self.rng.randrange(i, len(self))
+        self[i], self[j] = self[j], self[i]
+        self.doge_index += 1
+        return self[i]
+
+    def take(self, count):
+        """Get count items at once.
 
-        Deques themselves do not support this, so this will make all items into
-        a list, shuffle that list, clear the deque, and then re-init the deque.
+        The items come in shuffle bag order like with get(), but with a
+        single random float per item, which is a lot cheaper than randrange().
         """
-        args = list(self)
-        random.shuffle(args)
+        if not self:
+            return ["wow"] * count
+
+        random = self.rng.random
+        size = len(self)
+        i = self.doge_index
+        items = []
+        append = items.append
+        for _ in range(count):
+            if i >= size:
+                i = 0
+            j = i + int(random() * (size - i))
+            item = self[j]
+            self[j] = self[i]
+            self[i] = item
+            append(item)
+            i += 1
+        self.doge_index = i
+        return items
 
-        self.clear()
-        super().__init__(args)
+    def shuffle(self):
+        """Start a new round, making every item available again."""
+        self.doge_index = 0
+
+    def clear(self):
+        """Remove all items."""
+        self.doge_index = 0
+        super().clear()
 
 
 class FrequencyBasedDogeDeque(deque):
-    """A doge deque based on word frequencies."""
+    """A doge deque based on word frequencies.
+
+    Items are counted as they come in, and the deque holds every unique item
+    once, least frequent first. Extending only updates the counts of the new
+    items and re-ranks the unique ones, so building from millions of words
+    stays close to linear.
+    """
 
     def __init__(self, *args, **kwargs):
         self.doge_index = 0
         self.step = kwargs.get("step", 2)
-        args = list(args)
-        # sort words by frequency
-        args = sorted(set(args), key=args.count)
-        super().__init__(args)
+        self.rng = kwargs.get("rng") or random
+        self.counts = Counter(args)
+        super().__init__(self.ranked())
+
+    def ranked(self):
+        """Return the unique items sorted by frequency."""
+        return sorted(self.counts, key=self.counts.__getitem__)
 
     def shuffle(self):
         """Shuffle the deque."""
@@ -93,44 +121,152 @@ class FrequencyBasedDogeDeque(deque):
         if self.doge_index >= len(self):
             self.doge_index = 0
 
-        step = random.randint(1, min(self.step, len(self)))
+        step = self.rng.randint(1, min(self.step, len(self)))
 
         res = self[0]
         self.doge_index += step
         self.rotate(step)
         return res
 
+    def take(self, count):
+        """Get count items at once."""
+        return [self.get() for _ in range(count)]
+
     def extend(self, iterable):
-        """Extend and recalculate."""
-        existing = list(self)
-        merged = existing + list(iterable)
-        self.clear()
+        """Extend and recalculate.
+
+        Like a Counter, this also takes a mapping of items to their counts.
+        """
+        self.counts.update(iterable)
+        super().clear()
         self.doge_index = 0
-        new_to_add = sorted(set(merged), key=merged.count)
-        super().__init__(new_to_add)
+        super().extend(self.ranked())
+
+    def clear(self):
+        """Remove all items and forget how often they were seen."""
+        self.counts.clear()
+        super().clear()
 
 
-def easter_dates():
+class WeightedDogeDeque(list):
+    """A doge deque that gets items as often as they were seen.
+
+    Every unique item is kept once, and gotten with a probability of its
+    count raised to exponent, over the sum of all of those. An exponent of 1
+    follows the counts, lower flattens them down to uniform at 0, and higher
+    sharpens them.
+
+    Items are drawn from an alias table (Vose's method), which takes O(n) to
+    build and O(1) per get. Extending only updates the counts, and the table
+    is rebuilt the next time an item is gotten, so extending many times in a
+    row, such as with every chunk of stdin, builds it once.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.exponent = kwargs.get("exponent", 1.0)
+        self.rng = kwargs.get("rng") or random
+        self.counts = Counter(args)
+        self.prob = self.alias = None
+        super().__init__(self.counts)
+
+    def build(self):
+        """Build the alias table from the counts."""
+        size = len(self)
+        # Relative to the highest count, so that big exponents can't overflow.
+        most = max(self.counts.values())
+        weights = [(self.counts[item] / most) ** self.exponent for item in self]
+        total = sum(weights)
+        scaled = [weight * size / total for weight in weights]
+
+        self.prob = [1.0] * size
+        self.alias = list(range(size))
+        small = [i for i, weight in enumerate(scaled) if weight < 1]
+        large = [i for i, weight in enumerate(scaled) if weight >= 1]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            self.prob[less] = scaled[less]
+            self.alias[less] = more
+            scaled[more] += scaled[less] - 1
+            (small if scaled[more] < 1 else large).append(more)
+        # Whatever is left is 1, give or take rounding errors.
+
+    def get(self):
+        """Get one item, as likely as its weight."""
+        if not self:
+            return "wow"
+        if self.prob is None:
+            self.build()
+
+        i = int(self.rng.random() * len(self))
+        return self[i] if self.rng.random() < self.prob[i] else self[self.alias[i]]
+
+    def take(self, count):
+        """Get count items at once."""
+        if not self:
+            return ["wow"] * count
+        if self.prob is None:
+            self.build()
+
+        random = self.rng.random
+        size = len(self)
+        prob = self.prob
+        alias = self.alias
+        items = []
+        for _ in range(count):
+            i = int(random() * size)
+            items.append(self[i] if random() < prob[i] else self[alias[i]])
+        return items
+
+    def shuffle(self):
+        """Shuffle the deque."""
+
+    def extend(self, iterable):
+        """Count the new items, and add the ones never seen before.
+
+        Like a Counter, this also takes a mapping of items to their counts.
+        """
+        known = len(self.counts)
+        self.counts.update(iterable)
+        super().extend(itertools.islice(self.counts, known, None))
+        self.prob = self.alias = None
+
+    def clear(self):
+        """Remove all items and forget how often they were seen."""
+        self.counts.clear()
+        self.prob = self.alias = None
+        super().clear()
+
+
+def easter_dates(year):
     """Calculate the start and stop dates of Easter."""
-    this_year = dt.datetime.now(tz=dateutil.tz.tzlocal()).year
-    easter_day = dateutil.easter.easter(this_year)
+    import dateutil.easter  # noqa: PLC0415
+
+    easter_day = dateutil.easter.easter(year)
     start = easter_day - dt.timedelta(days=7)
     stop = easter_day + dt.timedelta(days=1)
-    return ((start.month, start.day), (stop.month, stop.day))
-
+    return (((start.month, start.day), (stop.month, stop.day)),)
 
-def moon_dates(look_back_days=14, margin_time_hours=12):
-    """Calculate the nearest full moon date."""
-    now = dt.datetime.now(tz=dateutil.tz.tzlocal())
-    moon_calculation_start = now - dt.timedelta(days=look_back_days)
-    full_moon_finder = fullmoon.NextFullMoon()
-    full_moon_finder.set_origin_datetime(moon_calculation_start)
-    calculated_full_moon = full_moon_finder.next_full_moon()
-    start = calculated_full_moon - dt.timedelta(hours=margin_time_hours)
-    stop = calculated_full_moon + dt.timedelta(hours=margin_time_hours)
-    return ((start.month, start.day), (stop.month, stop.day))
 
+def moon_dates(year, margin_time_hours=12):
+    """Calculate the dates of every full moon in a year."""
+    import fullmoon  # noqa: PLC0415
 
+    full_moon_finder = fullmoon.NextFullMoon()
+    new_year = dt.datetime(year, 1, 1)  # noqa: DTZ001
+    full_moon_finder.set_origin_datetime(new_year)
+    dates = []
+    while (calculated_full_moon := full_moon_finder.next_full_moon()).year <= year:
+        start = max(
+            calculated_full_moon - dt.timedelta(hours=margin_time_hours), new_year
+        )
+        stop = calculated_full_moon + dt.timedelta(hours=margin_time_hours)
+        dates.append(((start.month, start.day), (stop.month, stop.day)))
+    return tuple(dates)
+
+
+# The deques below are shared by everything in the process, so doge never gets
+# from them directly. Every Doge makes its own copies, drawing from its own
+# random state, which keeps concurrent renders from stepping on each other.
 PREFIXES = DogeDeque(
     "wow",
     "such",
@@ -204,7 +340,9 @@ COLORS = DogeDeque(
 # Tuple for every single date is in (month, day) format (year is discarded).
 # Doge checks if current date falls in between these dates and show wow
 # congratulations, so do whatever complex math you need to make sure Shibe
-# celebrates with you!
+# celebrates with you! Dates that move around can be given as a function that
+# takes the year and returns a tuple of (start, end) pairs; it is only called
+# when doge.season builds the calendar for a new year.
 SEASONS = {
     "valentine": {
         "dates": ((2, 12), (2, 15)),
@@ -273,7 +411,7 @@ SEASONS = {
         ),
     },
     "easter": {
-        "dates": easter_dates(),
+        "dates": easter_dates,
         "pic": "doge-easter.txt",
         "words": (
             "easter",
@@ -336,7 +474,7 @@ SEASONS = {
         ),
     },
     "moon": {
-        "dates": moon_dates(),
+        "dates": moon_dates,
         "pic": "doge-moon.txt",
         "words": (
             "hi-res 4K moon",
@@ -359,7 +497,7 @@ SEASONS = {
 }
 
 # Using "1 2 3".split() keeps the line count low, even with black auto-formatting.
-STOPWORDS = [
+STOPWORDS = frozenset(
     """
     able about above abroad according accordingly across actually adj after
     afterwards again against ago ahead ain't all allow allows almost alone along
@@ -486,4 +624,4 @@ STOPWORDS = [
     I a about an are as at be by com for from how in is it of on or that the
     this to was what when where who will with the www
     """.split()
-]
+)